@@ -0,0 +1,29 @@
+# Compares the time needed for reading the Excel files of the test data (or those in a given directory)
+# with each of the installed excel engines, run it from the DACHS source top-level directory:
+#   PYTHONPATH=src python scripts/BenchmarkExcelEngines.py [dataPath] [repetitions]
+
+import sys
+import time
+from pathlib import Path
+
+from dachs.workbook import engineAvailable, excelEngines, readWorkbook
+
+
+def benchmark(filename: Path, engine: str, repetitions: int) -> float:
+    """Returns the best time of reading all sheets of *filename*"""
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        readWorkbook(filename, sheet_name=None, engine=engine)
+        times += [time.perf_counter() - start]
+    return min(times)
+
+
+if __name__ == "__main__":
+    dataPath = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("tests", "testData")
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    engines = [engine for engine in excelEngines if engine != "auto" and engineAvailable(engine)]
+    print(f"{'file':<40}" + "".join(f"{engine:>12}" for engine in engines) + f"{'speedup':>10}")
+    for filename in sorted(dataPath.glob("*.xlsx")):
+        times = [benchmark(filename, engine, repetitions) for engine in engines]
+        print(f"{filename.name:<40}" + "".join(f"{t:>11.3f}s" for t in times) + f"{times[0] / min(times):>9.1f}x")
@@ -0,0 +1,54 @@
+# Compares writing the serialized structure of the test data to HDF5 with mcsas3.mc_hdf.storeKVPairs, which opens
+# the file for each key, and with the DACHS writer in dachs.hdf5, with and without compression.
+# Run it from the DACHS source top-level directory:
+#   PYTHONPATH=src python scripts/BenchmarkHDF5Writer.py [repetitions]
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcsas3.mc_hdf import storeKVPairs
+
+import dachs.hdf5
+import dachs.serialization
+import dachs.structure
+
+basepath = Path("tests", "testData")
+writers = {
+    "storeKVPairs": lambda fn, pairs: storeKVPairs(fn, "", pairs),
+    "writeKV": lambda fn, pairs: dachs.hdf5.writeKV(fn, pairs),
+    "writeKV gzip": lambda fn, pairs: dachs.hdf5.writeKV(fn, pairs, compression="gzip", shuffle=True),
+    "writeKV lzf": lambda fn, pairs: dachs.hdf5.writeKV(fn, pairs, compression="lzf"),
+}
+
+
+def benchmark(writer, pairs: list, repetitions: int) -> tuple:
+    """Returns the best time of writing *pairs* to a new file and the size of the file"""
+    times = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(repetitions):
+            filename = Path(tmpdir, f"{i}.h5")
+            start = time.perf_counter()
+            writer(filename, pairs)
+            times += [time.perf_counter() - start]
+        return min(times), filename.stat().st_size
+
+
+if __name__ == "__main__":
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    logging.disable(logging.WARNING)
+    exp = dachs.structure.create(
+        basepath / "AutoMOFs_The_Logbook.xlsx",
+        [basepath / "AutoMOFs_5_log.csv"] * 2,
+        basepath / "AutoMOFs_5_log.csv",
+        "AMSET_6",
+        sampleID="L001",
+    )
+    for layout in dachs.serialization.rawLogLayouts:
+        pairs = list(dachs.serialization.iterKV(exp, logLayout=layout))
+        print(f"raw log layout '{layout}', {len(pairs)} pairs:")
+        for name, writer in writers.items():
+            seconds, size = benchmark(writer, pairs, repetitions)
+            print(f"  {name:<20}{seconds:>8.3f}s{size / 1e6:>10.2f} MB")
@@ -0,0 +1,30 @@
+# Measures the cold-start time of the dachs command line, for showing the help and for importing each
+# of the DACHS modules in a fresh interpreter, run it from the DACHS source top-level directory:
+#   PYTHONPATH=src python scripts/BenchmarkImportTime.py [repetitions]
+
+import subprocess
+import sys
+import time
+
+commands = {
+    "dachs --help": ["-m", "dachs", "--help"],
+    "import dachs.main": ["-c", "import dachs.main"],
+    "import dachs.structure": ["-c", "import dachs.structure"],
+    "dachs.ureg": ["-c", "import dachs; dachs.ureg"],
+}
+
+
+def benchmark(arguments: list, repetitions: int) -> float:
+    """Returns the best time of running the Python interpreter with *arguments*"""
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, check=True, stdout=subprocess.DEVNULL)
+        times += [time.perf_counter() - start]
+    return min(times)
+
+
+if __name__ == "__main__":
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, arguments in commands.items():
+        print(f"{name:<30}{benchmark(arguments, repetitions):>8.3f}s")
@@ -1,16 +1,32 @@
 # -*- coding: utf-8 -*-
 # __init__.py
 
-import pint
+import functools
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
 
 __version__ = "0.5.5"
 
-ureg = pint.UnitRegistry(auto_reduce_dimensions=True)
-ureg.define(r"percent = 0.01 = %")
-ureg.define(r"item = 1")
+# the definitions added to the pint default units
+unitDefinitions = (r"percent = 0.01 = %", r"item = 1")
+# a separate dimension for each currency: name, symbol, aliases
+currencies = (
+    ("USD", "$", ("Dollar", "dollar", "usd")),
+    ("JPY", "¥", ("Yen", "yen")),
+    ("EUR", "€", ("Euro", "euro", "Eur", "eur")),
+)
+# set the exchange rates as of 23 Apr.3
+exchangeRates = ("EUR = 1.09 USD", "JPY = .0075 USD")
+
+_uregLock = threading.Lock()
+
 
+def currency(ureg, name, symbol, aliases):
+    import pint
 
-def currency(name, symbol, aliases):
     ureg.define(
         pint.facets.plain.UnitDefinition(
             name,
@@ -23,10 +39,50 @@ def currency(name, symbol, aliases):
     )
 
 
-currency("USD", "$", ("Dollar", "dollar", "usd"))
-currency("JPY", "¥", ("Yen", "yen"))
-currency("EUR", "€", ("Euro", "euro", "Eur", "eur"))
+def registryCacheFolder() -> Optional[Path]:
+    """
+    The folder for pint's cache of the parsed unit definitions, keyed on the pint version and the definitions
+    of DACHS. Set by the environment variable DACHS_PINT_CACHE, the user cache directory by default,
+    or no caching if it is set to 'none'.
+    """
+    import pint
+    import platformdirs
 
-# set the exchange rates as of 23 Apr.3
-ureg.define("EUR = 1.09 USD")
-ureg.define("JPY = .0075 USD")
+    cacheDir = os.environ.get("DACHS_PINT_CACHE", "") or platformdirs.user_cache_dir("dachs")
+    if cacheDir.lower() == "none":
+        return None
+    key = repr((pint.__version__, unitDefinitions, currencies, exchangeRates))
+    return Path(cacheDir, "pint", hashlib.sha1(key.encode()).hexdigest()[:16])
+
+
+def makeRegistry(cacheFolder: Optional[Path] = None):
+    """Creates the unit registry with the units and currencies used in DACHS"""
+    import pint
+
+    try:
+        ureg = pint.UnitRegistry(auto_reduce_dimensions=True, cache_folder=cacheFolder)
+    except OSError:  # cache folder not writable, parse the definitions again
+        ureg = pint.UnitRegistry(auto_reduce_dimensions=True)
+    for definition in unitDefinitions:
+        ureg.define(definition)
+    for name, symbol, aliases in currencies:
+        currency(ureg, name, symbol, aliases)
+    for rate in exchangeRates:
+        ureg.define(rate)
+    return ureg
+
+
+@functools.lru_cache(maxsize=None)
+def getRegistry():
+    """The unit registry of DACHS, built on first use from the cached pint definitions"""
+    return makeRegistry(registryCacheFolder())
+
+
+def __getattr__(name):
+    # the registry is created on first use of dachs.ureg only, importing pint and building it takes a while
+    if name == "ureg":
+        with _uregLock:  # a single registry, Quantities of different registries cannot be combined
+            if "ureg" not in globals():
+                globals()["ureg"] = getRegistry()
+        return globals()["ureg"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
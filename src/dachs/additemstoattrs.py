@@ -12,10 +12,77 @@ __license__ = "GPLv3+"
 __date__ = "2022/11/07"
 __status__ = "beta"
 
+import functools
 from collections.abc import Iterable
-from typing import Any, NoReturn
+from typing import Any, Dict, List, NoReturn, Optional, Sequence, Tuple
+
+from attrs import NOTHING, Attribute, Factory, fields, validators
+
+
+@functools.lru_cache(maxsize=None)
+def fieldNames(cls: type) -> Tuple[str, ...]:
+    """The names of the fields of an attrs class, looked up once per class"""
+    return tuple(ifield.name for ifield in fields(cls))
+
+
+@functools.lru_cache(maxsize=None)
+def storedFieldNames(cls: type, excludeKeys: Tuple[str, ...]) -> Tuple[str, ...]:
+    """The names of the fields to store, those not in *excludeKeys* and not private, computed once per class"""
+    return tuple(i for i in fieldNames(cls) if (i not in excludeKeys and not i.startswith("_")))
+
+
+@functools.lru_cache(maxsize=None)
+def initFields(cls: type) -> Dict[str, Attribute]:
+    """The fields of an attrs class by their __init__ argument names (without leading underscore)"""
+    return {ifield.alias: ifield for ifield in fields(cls) if ifield.init}
+
+
+@functools.lru_cache(maxsize=None)
+def _defaults(cls: type) -> Tuple[Tuple[str, Optional[str], Any], ...]:
+    # for each field of an attrs class: its name, __init__ argument name (None if not set by __init__), default
+    return tuple((ifield.name, ifield.alias if ifield.init else None, ifield.default) for ifield in fields(cls))
+
+
+# the validator classes of which the accepted types can be checked for a whole column at once
+_instanceOfValidator = type(validators.instance_of(object))
+_optionalValidator = type(validators.optional(validators.instance_of(object)))
+_andValidator = type(validators.and_(validators.instance_of(object)))
+
+
+def _acceptedTypes(validator) -> Optional[Tuple[Tuple[type, ...], bool]]:
+    # the types accepted by an (optional) instance_of validator and if None is accepted, None for other validators
+    if isinstance(validator, _instanceOfValidator):
+        types = validator.type
+        return (types if isinstance(types, tuple) else (types,)), False
+    if isinstance(validator, _optionalValidator):
+        accepted = _acceptedTypes(validator.validator)
+        return (accepted[0], True) if accepted is not None else None
+    return None
+
+
+def validateColumn(attribute: Attribute, values: Sequence, validator=None) -> None:
+    """
+    Runs the validator of *attribute* on all *values*, raising the same error as constructing an instance with
+    the first invalid value would. For instance_of validators, each distinct type is checked once only.
+    """
+    validator = attribute.validator if validator is None else validator
+    if validator is None:
+        return
+    if isinstance(validator, _andValidator):
+        for subValidator in validator._validators:
+            validateColumn(attribute, values, subValidator)
+        return
+    accepted = _acceptedTypes(validator)
+    if accepted is None:  # any other validator is called for each value
+        for value in values:
+            validator(None, attribute, value)
+        return
+    types, acceptsNone = accepted
+    for valueType in {type(value) for value in values}:
+        if (valueType is type(None) and acceptsNone) or issubclass(valueType, types):
+            continue
+        validator(None, attribute, next(value for value in values if type(value) is valueType))
 
-from attrs import fields
 
 # Mixin class for making a dict-like object out of an attrs class
 # from: https://github.com/python-attrs/attrs/issues/879
@@ -35,11 +102,10 @@ class addItemsToAttrs:  # used to be MutableMappingMixin(MutableMapping)
     _loadKeys = list()
 
     def __iter__(self) -> Iterable:
-        for ifield in fields(self.__class__):
-            yield ifield.name
+        return iter(fieldNames(self.__class__))
 
     def __len__(self) -> int:
-        return len(fields(self.__class__))
+        return len(fieldNames(self.__class__))
 
     def __getitem__(self, k: str) -> Any:
         """
@@ -64,14 +130,72 @@ class addItemsToAttrs:  # used to be MutableMappingMixin(MutableMapping)
         return self.__iter__()
 
     def values(self) -> Iterable:
-        for key in self.__iter__():
+        for key in fieldNames(self.__class__):
             yield self.__getattribute__(key)
 
     def items(self) -> Iterable:
-        for key in self.__iter__():
+        for key in fieldNames(self.__class__):
             yield key, self.__getattribute__(key)
 
+    @classmethod
+    def validateColumns(cls, **columns: Sequence) -> None:
+        """
+        Checks the values of the *columns* (sequences of values by their __init__ argument names) against the
+        validators of the fields, as constructing an instance for each row would. Converters are not applied,
+        the values must have their final type already.
+        """
+        byAlias = initFields(cls)
+        for alias, values in columns.items():
+            if alias not in byAlias:
+                raise TypeError(f"{cls.__name__} has no field '{alias}'")
+            validateColumn(byAlias[alias], values)
+
+    @classmethod
+    def fromTrusted(cls, **values: Any):
+        """
+        Creates an instance from *values* which already have their final type, without running the converters
+        and validators of the fields. For data which was validated before, e.g. by validateColumns, or written
+        by DACHS itself. Fields which are not given get their default, __attrs_post_init__ runs as usual.
+        """
+        byAlias = initFields(cls)
+        unknown = set(values).difference(byAlias)
+        if len(unknown):
+            raise TypeError(f"{cls.__name__} has no fields {sorted(unknown)}")
+        obj = cls.__new__(cls)
+        setField = object.__setattr__  # bypasses the on_setattr converters and validators
+        for name, alias, default in _defaults(cls):
+            if alias in values:
+                value = values[alias]
+            elif default is NOTHING:
+                raise TypeError(f"{cls.__name__}.fromTrusted() missing a value for '{alias}'")
+            elif isinstance(default, Factory):
+                value = default.factory(obj) if default.takes_self else default.factory()
+            else:
+                value = default
+            setField(obj, name, value)
+        postInit = getattr(obj, "__attrs_post_init__", None)
+        if postInit is not None:
+            postInit()
+        return obj
+
+    @classmethod
+    def fromColumns(cls, validate: bool = True, **columns: Sequence) -> List:
+        """
+        Creates one instance for each row of the *columns* (sequences of values with their final type, by their
+        __init__ argument names) with fromTrusted. With *validate*, all columns are checked by validateColumns
+        first, so the instances are as valid as if they were constructed one by one.
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns of different lengths {sorted(lengths)} for {cls.__name__}")
+        if validate:
+            cls.validateColumns(**columns)
+        names = list(columns)
+        return [cls.fromTrusted(**dict(zip(names, row))) for row in zip(*columns.values())]
+
     def __attrs_post_init__(self):
-        # auto-generate the store and load key lists:
-        self._storeKeys = [i for i in self.keys() if (i not in self._excludeKeys and not i.startswith("_"))]
-        self._loadKeys = [i for i in self.keys() if (i not in self._excludeKeys and not i.startswith("_"))]
+        # auto-generate the store and load key lists, from the names computed once per class.
+        # Each instance gets its own lists, they may be extended afterwards
+        keys = storedFieldNames(self.__class__, tuple(self._excludeKeys))
+        self._storeKeys = list(keys)
+        self._loadKeys = list(keys)
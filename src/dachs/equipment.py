@@ -19,7 +19,7 @@ from attrs import Factory, define, field, validators
 
 from dachs import ureg  # get importError when using: "from . import ureg"
 from dachs.additemstoattrs import addItemsToAttrs
-from dachs.helpers import whitespaceCleanup
+from dachs.helpers import derivedValueCache, whitespaceCleanup
 
 
 @define
@@ -80,7 +80,7 @@ class PV(addItemsToAttrs):
 
 
 @define
-class Equipment(addItemsToAttrs):
+class Equipment(addItemsToAttrs, derivedValueCache):
     ID: str = field(
         default=None,
         validator=validators.instance_of(str),
@@ -146,6 +146,10 @@ class Equipment(addItemsToAttrs):
     #     super().__attrs_post_init__()
 
     def PricePerUnit(self):
+        # computed again when UnitPrice or UnitSize are replaced
+        return self._memoized("PricePerUnit", (self.UnitPrice, self.UnitSize), self._PricePerUnit)
+
+    def _PricePerUnit(self):
         assert (self.UnitPrice is not None) and (self.UnitSize is not None), logging.warning(
             "PricePerUnit can only be calculated when both UnitSize and UnitPrice are set"
         )
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+A shared cache for parsing chemical formulas into chempy Substances and their molar mass.
+The same handful of formulas is parsed for every sample, so the results are kept in memory and,
+optionally, in a JSON file on disk for reuse by other processes.
+"""
+
+__author__ = "Brian R. Pauw"
+__contact__ = "brian@stack.nl"
+__license__ = "GPLv3+"
+__date__ = "2026/10/18"
+__status__ = "beta"
+
+import functools
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import chempy
+
+from dachs import ureg
+from dachs.units import unitCache
+
+
+def storeFileFromEnviron() -> Optional[Path]:
+    storeFile = os.environ.get("DACHS_FORMULA_CACHE", "")
+    return Path(storeFile) if storeFile else None
+
+
+def substanceRecord(substance: chempy.Substance) -> Dict[str, Any]:
+    """The attributes of a parsed Substance and its molar mass (in g/mol), as stored in the JSON file"""
+    return dict(
+        name=substance.name,
+        latex_name=substance.latex_name,
+        unicode_name=substance.unicode_name,
+        html_name=substance.html_name,
+        composition={str(k): v for k, v in (substance.composition or {}).items()},
+        molarMass=float(substance.molar_mass().magnitude),
+    )
+
+
+def substanceFromRecord(record: Dict[str, Any]) -> Tuple[chempy.Substance, float]:
+    substance = chempy.Substance(
+        name=record["name"],
+        latex_name=record["latex_name"],
+        unicode_name=record["unicode_name"],
+        html_name=record["html_name"],
+        composition={int(k): v for k, v in record["composition"].items()},
+    )
+    return substance, record["molarMass"]
+
+
+class FormulaCache:
+    """
+    Parses chemical formulas once, keeping the most recently used ones in memory.
+
+    :param storeFile: Optional JSON file for keeping the parsed formulas across runs. Defaults to the file
+        given by the environment variable DACHS_FORMULA_CACHE, if set.
+    :param maxsize: The number of formulas kept in memory.
+    """
+
+    def __init__(self, storeFile: Optional[Path] = None, maxsize: int = 1024):
+        self.storeFile = Path(storeFile) if storeFile is not None else None
+        self._store: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+        self._parse = functools.lru_cache(maxsize=maxsize)(self._parseFormula)
+
+    def clear(self) -> None:
+        """Forgets everything held in memory, the JSON file is kept"""
+        with self._lock:
+            self._parse.cache_clear()
+            self._store = None
+
+    def _storeFile(self) -> Optional[Path]:
+        return self.storeFile if self.storeFile is not None else storeFileFromEnviron()
+
+    def _loadStore(self, storeFile: Path) -> Dict[str, Dict[str, Any]]:
+        if self._store is None:
+            self._store = {}
+            if storeFile.is_file():
+                try:
+                    content = json.loads(storeFile.read_text())
+                    if content.get("chempy") == chempy.__version__:
+                        self._store = content["formulas"]
+                except Exception as e:  # unreadable file, parse the formulas again
+                    logging.warning(f"Ignoring formula cache file '{storeFile}': {e}")
+        return self._store
+
+    def _writeStore(self, storeFile: Path) -> None:
+        storeFile.parent.mkdir(parents=True, exist_ok=True)
+        tmpfn = storeFile.with_name(storeFile.name + f".{os.getpid()}.tmp")
+        tmpfn.write_text(json.dumps(dict(chempy=chempy.__version__, formulas=self._store), indent=1))
+        os.replace(tmpfn, storeFile)
+
+    def _parseFormula(self, formula: str) -> Tuple[chempy.Substance, float]:
+        with self._lock:
+            storeFile = self._storeFile()
+            if storeFile is None:
+                substance = chempy.Substance.from_formula(formula)
+                return substance, float(substance.molar_mass().magnitude)
+            store = self._loadStore(storeFile)
+            if formula not in store:
+                store[formula] = substanceRecord(chempy.Substance.from_formula(formula))
+                self._writeStore(storeFile)
+            return substanceFromRecord(store[formula])
+
+    def substance(self, formula: str) -> chempy.Substance:
+        """The chempy Substance parsed from *formula*, shared between callers: do not modify it"""
+        return self._parse(formula)[0]
+
+    def molarMass(self, formula: str) -> ureg.Quantity:
+        """The molar mass of *formula* as a new Quantity in g/mol"""
+        return unitCache.quantity(self._parse(formula)[1], "g/mol")
+
+
+# the process-wide instance used by the readers and the Chemical class
+formulaCache = FormulaCache()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Writes the key-value pairs of a serialized DACHS structure to a HDF5 file, in the same layout as
+mcsas3.mc_hdf.storeKVPairs: a group for each path, a dataset for each value, and pint Quantities as their
+magnitude with a 'unit' attribute. The file is opened once for all pairs instead of once per pair, and the
+array datasets can be chunked and compressed.
+"""
+
+__author__ = "Brian R. Pauw"
+__contact__ = "brian@stack.nl"
+__license__ = "GPLv3+"
+__date__ = "2026/10/18"
+__status__ = "beta"
+
+import logging
+from pathlib import Path, PurePath, PurePosixPath
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import h5py
+import numpy as np
+import pandas as pd
+import pint
+
+# the supported compression filters of array datasets, 'none' for no compression
+compressions = ("none", "gzip", "lzf")
+
+
+def datasetValue(value: Any) -> Tuple[Any, Optional[str]]:
+    """The value as written to a dataset and its unit, or None if it has none, converted like storeKV() does"""
+    unit = None
+    if isinstance(value, pint.Quantity):
+        value, unit = value.m, str(value.u)
+    if isinstance(value, Path):
+        value = value.as_posix()
+    if isinstance(value, pd.Timestamp):
+        value = value.timestamp()
+    if isinstance(value, (list, tuple)):
+        value = np.array(value)
+    if isinstance(value, (np.ndarray, pd.Series)):
+        value = np.asarray(value)
+        if value.dtype.kind in "UO":
+            value = value.astype(h5py.special_dtype(vlen=str))
+    return value, unit
+
+
+class KVWriter:
+    """
+    Writes key-value pairs to an open HDF5 file or group. Existing datasets of the same name are replaced.
+
+    :param h5g: The HDF5 file or group to write to, the keys are relative to it.
+    :param compression: The compression filter of array datasets, one of *compressions*, or None.
+    :param compressionOpts: Options of the compression filter, the level 0-9 for gzip.
+    :param chunks: The chunk shape of array datasets, True for choosing it automatically. Implied by compression.
+    :param shuffle: Apply the byte shuffle filter before compressing, often helps for numbers.
+    :param minSize: Arrays with fewer elements are stored contiguously, without chunks and compression.
+    """
+
+    def __init__(
+        self,
+        h5g: h5py.Group,
+        compression: Optional[str] = None,
+        compressionOpts: Optional[int] = None,
+        chunks: Union[bool, Tuple[int, ...], None] = None,
+        shuffle: bool = False,
+        minSize: int = 64,
+    ):
+        if compression == "none":
+            compression = None
+        if compression is not None and compression not in compressions:
+            raise ValueError(f"Unknown HDF5 compression {compression=}, choose from {compressions}")
+        self.h5g = h5g
+        self.options: Dict[str, Any] = {}
+        if compression is not None:
+            self.options.update(compression=compression, compression_opts=compressionOpts, chunks=chunks or True)
+        elif chunks:
+            self.options.update(chunks=chunks)
+        if shuffle:
+            self.options.update(shuffle=True, chunks=chunks or True)
+        self.minSize = minSize
+        self._groups: Dict[PurePosixPath, h5py.Group] = {}
+
+    def group(self, path: PurePosixPath) -> h5py.Group:
+        """The group at *path*, created with all its parents on first use"""
+        group = self._groups.get(path)
+        if group is None:
+            group = self.h5g.require_group(str(path)) if path.parts else self.h5g
+            self._groups[path] = group
+        return group
+
+    def write(self, path: Union[str, PurePath], value: Any) -> None:
+        """Writes *value* to the dataset at *path*, dicts and DataFrames to a group of their items"""
+        path = PurePosixPath(path)
+        if isinstance(value, (dict, pd.DataFrame)):
+            self.writeAll((path / str(key), val) for key, val in value.items())
+            return
+        group = self.group(path.parent)
+        value, unit = datasetValue(value)
+        if value is None:
+            return
+        if path.name in group:
+            del group[path.name]
+        options = {}
+        if isinstance(value, np.ndarray) and value.ndim and value.size >= max(self.minSize, 1):
+            options = self.options
+        dset = group.create_dataset(path.name, data=value, **options)
+        if unit is not None:
+            dset.attrs["unit"] = unit
+
+    def writeAll(self, pairs: Iterable[Tuple[Union[str, PurePath], Any]]) -> int:
+        """Writes all key-value *pairs*, returns the number of pairs written"""
+        count = 0
+        for path, value in pairs:
+            try:
+                self.write(path, value)
+            except Exception:
+                logging.error(f"Error for path {path} and value '{value}' of type {type(value)}.")
+                raise
+            count += 1
+        return count
+
+
+def writeKV(filename: Path, pairs: Iterable[Tuple[Union[str, PurePath], Any]], **options) -> int:
+    """
+    Writes all key-value *pairs* to the HDF5 file *filename*, which is created if needed and opened once.
+    Replaces mcsas3.mc_hdf.storeKVPairs(filename, '', pairs), see *KVWriter* for the *options*.
+    Returns the number of pairs written.
+    """
+    with h5py.File(filename, "a") as h5f:
+        return KVWriter(h5f, **options).writeAll(pairs)
@@ -5,6 +5,9 @@
 Utility functions
 """
 
+import sys
+from typing import Any, Callable
+
 import pandas as pd
 
 
@@ -16,3 +19,36 @@ def whitespaceCleanup(text):
         if all([pd.isnull(elem) for elem in text]):
             return ""
     return " ".join(str(text).split())
+
+
+def internStr(value: Any) -> str:
+    """str(value), interned so that the many repeats of a string share a single object"""
+    return sys.intern(str(value))
+
+
+class derivedValueCache:
+    """
+    Mixin for attrs classes, keeping values derived from their attributes in a slot which is not an attrs field,
+    so it is not listed, compared, copied or stored with them.
+    """
+
+    __slots__ = ("_derivedValues",)
+
+    def _derivedCache(self) -> dict:
+        try:
+            return self._derivedValues
+        except AttributeError:  # first use, or a copy made by attrs
+            self._derivedValues = {}
+            return self._derivedValues
+
+    def _memoized(self, name: str, inputs: tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Returns compute(), kept under *name* together with the *inputs* it was computed from.
+        It is computed again only when any of the inputs has been replaced by another object since.
+        """
+        cache = self._derivedCache()
+        cached = cache.get(name)
+        if cached is None or len(cached[0]) != len(inputs) or any(a is not b for a, b in zip(cached[0], inputs)):
+            cached = (inputs, compute())
+            cache[name] = cached
+        return cached[1]
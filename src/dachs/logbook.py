@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+A process-wide cache for the AutoMOF logbook workbook. Its sheets are parsed only once per batch run
+instead of once per sample, as long as the file does not change (same path, modification time and size).
+Besides the parsed sheets, the objects created from them (Equipment, Reagents) are kept in memory.
+Optionally, the parsed sheets are stored in a sidecar JSON file on disk as well, for reuse by other processes.
+Everything is cached per excel engine, the engines may differ in the types of the cells they return.
+"""
+
+__author__ = "Brian R. Pauw"
+__contact__ = "brian@stack.nl"
+__license__ = "GPLv3+"
+__date__ = "2026/10/18"
+__status__ = "beta"
+
+import copy
+import datetime
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from dachs.workbook import excelEngine, readWorkbook
+
+# the sheets used from the logbook, read together in a single pass over the workbook
+logbookSheets = ("Equipment", "Setup", "Chemicals")
+
+CacheKey = Tuple[str, int, int, str]
+
+
+def logbookKey(filename: Path, engine: Optional[str] = None) -> CacheKey:
+    """Identifies a logbook by its absolute path, modification time and size, and the excel engine reading it"""
+    filename = Path(filename).resolve()
+    stat = filename.stat()
+    return (str(filename), stat.st_mtime_ns, stat.st_size, excelEngine(engine))
+
+
+def encodeCell(value: Any) -> Any:
+    """A cell of a sheet as stored in JSON, with its type kept for the types JSON does not have"""
+    if isinstance(value, pd.Timestamp) or value is pd.NaT:
+        return {"Timestamp": value.isoformat()}
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, (datetime.date, datetime.time)):
+        return {type(value).__name__: value.isoformat()}
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    raise TypeError(f"Cannot store a cell of {type(value)} in the logbook cache")
+
+
+def decodeCell(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    ((typeName, text),) = value.items()
+    if typeName == "Timestamp":
+        return pd.Timestamp(text)
+    return getattr(datetime, typeName).fromisoformat(text)
+
+
+def encodeSheets(sheets: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """The parsed sheets in a form for storing them as JSON, column by column with their dtypes"""
+    encoded = {}
+    for name, df in sheets.items():
+        if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+            raise TypeError(f"Cannot store sheet '{name}' in the logbook cache, its index is not a row count")
+        encoded[name] = dict(
+            columns=[encodeCell(column) for column in df.columns],
+            columnsDtype=str(df.columns.dtype),
+            dtypes=[str(dtype) for dtype in df.dtypes],
+            data=[[encodeCell(value) for value in df.iloc[:, i].tolist()] for i in range(df.shape[1])],
+        )
+    return encoded
+
+
+def decodeSheets(encoded: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+    sheets = {}
+    for name, sheet in encoded.items():
+        columns = [pd.Series([decodeCell(value) for value in data], dtype=object) for data in sheet["data"]]
+        df = pd.concat(columns, axis=1) if len(columns) else pd.DataFrame()
+        df.columns = pd.Index([decodeCell(column) for column in sheet["columns"]], dtype=sheet["columnsDtype"])
+        sheets[name] = df.astype(dict(zip(df.columns, sheet["dtypes"]))) if len(columns) else df
+    return sheets
+
+
+def sidecarDirFromEnviron() -> Optional[Path]:
+    cacheDir = os.environ.get("DACHS_LOGBOOK_CACHE", "")
+    return Path(cacheDir) if cacheDir else None
+
+
+class LogbookCache:
+    """
+    Caches the parsed sheets of logbook workbooks and the objects derived from them.
+
+    :param sidecarDir: Optional directory for storing the parsed sheets on disk, reused by subsequent runs.
+        Defaults to the directory given by the environment variable DACHS_LOGBOOK_CACHE, if set.
+    """
+
+    def __init__(self, sidecarDir: Optional[Path] = None):
+        self.sidecarDir = Path(sidecarDir) if sidecarDir is not None else None
+        self._sheets: Dict[CacheKey, Dict[str, pd.DataFrame]] = {}
+        self._objects: Dict[Tuple[CacheKey, str], Any] = {}
+        self._lock = threading.RLock()
+
+    def clear(self) -> None:
+        """Forgets everything held in memory, sidecar files are kept"""
+        with self._lock:
+            self._sheets.clear()
+            self._objects.clear()
+
+    @staticmethod
+    def _outdated(key: CacheKey, current: CacheKey) -> bool:
+        return key[0] == current[0] and key[1:3] != current[1:3]
+
+    def _sidecarFile(self, key: CacheKey) -> Optional[Path]:
+        sidecarDir = self.sidecarDir if self.sidecarDir is not None else sidecarDirFromEnviron()
+        if sidecarDir is None:
+            return None
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return sidecarDir / f"{Path(key[0]).name}.{digest}.json"
+
+    def _loadSheets(self, key: CacheKey) -> Dict[str, pd.DataFrame]:
+        sidecar = self._sidecarFile(key)
+        if sidecar is not None and sidecar.is_file():
+            try:
+                return decodeSheets(json.loads(sidecar.read_text()))
+            except Exception as e:  # unreadable sidecar, parse the workbook again
+                logging.warning(f"Ignoring logbook cache file '{sidecar}': {e}")
+        logging.info(f"Reading logbook sheets {logbookSheets} from '{key[0]}'.")
+        sheets = readWorkbook(key[0], sheet_name=list(logbookSheets), engine=key[3], index_col=None, header=0)
+        if sidecar is not None:
+            try:
+                content = json.dumps(encodeSheets(sheets))
+            except TypeError as e:  # cells of other types, kept in memory only
+                logging.info(f"Not writing logbook cache file '{sidecar}': {e}")
+                return sheets
+            sidecar.parent.mkdir(mode=0o700, parents=True, exist_ok=True)  # private to the user
+            tmpfn = sidecar.with_name(sidecar.name + f".{os.getpid()}.tmp")
+            tmpfn.write_text(content)
+            os.replace(tmpfn, sidecar)
+        return sheets
+
+    def sheet(self, filename: Path, sheetName: str, engine: Optional[str] = None) -> pd.DataFrame:
+        """
+        Returns a copy of the parsed sheet *sheetName* of the logbook *filename*,
+        parsing the workbook with the given excel *engine* if it is not cached yet.
+        """
+        key = logbookKey(filename, engine)
+        with self._lock:
+            if key not in self._sheets:
+                # drop outdated entries of the same file, those of other engines are kept
+                self._sheets = {k: v for k, v in self._sheets.items() if not self._outdated(k, key)}
+                self._objects = {k: v for k, v in self._objects.items() if not self._outdated(k[0], key)}
+                self._sheets[key] = self._loadSheets(key)
+            return self._sheets[key][sheetName].copy()
+
+    def objects(self, filename: Path, name: str, create: Callable[[], Any], engine: Optional[str] = None) -> Any:
+        """
+        Returns the objects identified by *name* which were created from the logbook *filename*, as read by
+        the excel *engine*, by calling *create()* once. Callers get a deep copy, so they can modify it without
+        affecting the cache.
+        """
+        key = logbookKey(filename, engine)
+        with self._lock:
+            if (key, name) not in self._objects:
+                self._objects[(key, name)] = create()
+            return copy.deepcopy(self._objects[(key, name)])
+
+
+# the process-wide instance used by the readers
+logbookCache = LogbookCache()
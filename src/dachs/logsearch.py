@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+A search index over the messages of a raw log, for answering the many substring queries made while
+interpreting a synthesis log without scanning (and lowercasing) every message again for each query.
+"""
+
+__author__ = "Brian R. Pauw"
+__contact__ = "brian@stack.nl"
+__license__ = "GPLv3+"
+__date__ = "2026/10/18"
+__status__ = "beta"
+
+import re
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+tokenPattern = re.compile(r"\w+")
+
+
+def asTerms(terms: Union[str, Iterable[str], None]) -> Tuple[str, ...]:
+    """Lowercased search terms from a single string, a list of strings or None"""
+    if terms is None:
+        return ()
+    if isinstance(terms, str):
+        terms = [terms]
+    return tuple(term.lower() for term in terms)
+
+
+class LogQuery(NamedTuple):
+    """
+    A query for find_many_in_log and LogIndex.matchMany: all *searchString* terms and none of the *excludeString*
+    terms must be contained in a message. *Which* is 'first', 'last' or 'all' matching messages.
+    """
+
+    searchString: Union[str, Sequence[str]]
+    excludeString: Union[str, Sequence[str], None] = None
+    Which: str = "first"
+    raiseWarning: bool = True
+
+
+class LogIndex:
+    """
+    Index over the messages of a log, each message matches a query if it contains all of its search terms
+    and none of its exclude terms, compared case-insensitively (same as a substring test on lowercased text).
+
+    Messages are lowercased once and only the distinct messages are searched. A token -> message inverted
+    index narrows down the candidates of each term before the substring test. The row positions of a query
+    are computed once and kept, so repeated queries for the first or last match are answered directly.
+    """
+
+    def __init__(self, messages: Sequence[str]):
+        codes, uniques = pd.factorize(np.asarray(messages, dtype=object), use_na_sentinel=False)
+        self._codes = codes  # row position -> distinct message
+        self._messages = [str(message).lower() for message in uniques]
+        self._tokens: Dict[str, Set[int]] = {}  # token -> distinct messages containing it
+        for i, message in enumerate(self._messages):
+            for token in tokenPattern.findall(message):
+                self._tokens.setdefault(token, set()).add(i)
+        self._termCache: Dict[str, FrozenSet[int]] = {}
+        self._queryCache: Dict[Tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _candidates(self, term: str) -> Optional[Set[int]]:
+        # distinct messages which may contain *term*, based on its tokens, or None if all of them may
+        tokens = tokenPattern.findall(term)
+        if not len(tokens):
+            return None
+        candidates = None
+        for n, token in enumerate(tokens):
+            # tokens at the edges of the term may be part of a longer token in the message
+            atStart = n == 0 and term.startswith(token)
+            atEnd = n == len(tokens) - 1 and term.endswith(token)
+            if atStart and atEnd:
+                matches = [i for t, i in self._tokens.items() if token in t]
+            elif atStart:
+                matches = [i for t, i in self._tokens.items() if t.endswith(token)]
+            elif atEnd:
+                matches = [i for t, i in self._tokens.items() if t.startswith(token)]
+            else:
+                matches = [self._tokens.get(token, set())]
+            found = set().union(*matches)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                break
+        return candidates
+
+    def _termMatches(self, term: str) -> FrozenSet[int]:
+        # the distinct messages containing *term*
+        if term not in self._termCache:
+            candidates = self._candidates(term)
+            if candidates is None:
+                candidates = range(len(self._messages))
+            self._termCache[term] = frozenset(i for i in candidates if term in self._messages[i])
+        return self._termCache[term]
+
+    def matches(
+        self, searchStrings: Union[str, Iterable[str]], excludeStrings: Union[str, Iterable[str], None] = None
+    ) -> np.ndarray:
+        """The sorted row positions of the messages containing all *searchStrings* and no *excludeStrings*"""
+        key = (asTerms(searchStrings), asTerms(excludeStrings))
+        if key not in self._queryCache:
+            selected = set(range(len(self._messages)))
+            for term in key[0]:
+                selected &= self._termMatches(term)
+            for term in key[1]:
+                selected -= self._termMatches(term)
+            positions = np.flatnonzero(np.isin(self._codes, list(selected)))
+            positions.setflags(write=False)  # shared by all callers
+            self._queryCache[key] = positions
+        return self._queryCache[key]
+
+    def precedingMatches(
+        self, searchStrings: Union[str, Iterable[str]], excludeStrings: Union[str, Iterable[str], None] = None
+    ) -> np.ndarray:
+        """
+        For each row position, the position of the closest matching message before it, or -1 if there is none.
+        Computed once per query, so that looking up the match preceding any row takes constant time.
+        """
+        key = ("preceding",) + (asTerms(searchStrings), asTerms(excludeStrings))
+        if key not in self._queryCache:
+            marks = np.full(len(self._codes) + 1, -1, dtype=np.int64)
+            positions = self.matches(searchStrings, excludeStrings)
+            marks[positions + 1] = positions
+            preceding = np.maximum.accumulate(marks)[:-1]
+            preceding.setflags(write=False)
+            self._queryCache[key] = preceding
+        return self._queryCache[key]
+
+    def matchMany(self, queries: Dict[str, LogQuery]) -> Dict[str, np.ndarray]:
+        """
+        The sorted row positions of the messages matching each of the named *queries*. Each distinct term is
+        looked up once, through the token index like in *matches()*, and its matches are shared by all queries.
+        """
+        return {name: self.matches(query.searchString, query.excludeString) for name, query in queries.items()}
+
+    def first(
+        self, searchStrings: Union[str, Iterable[str]], excludeStrings: Union[str, Iterable[str], None] = None
+    ) -> Optional[int]:
+        """The row position of the first matching message, None if there is none"""
+        positions = self.matches(searchStrings, excludeStrings)
+        return int(positions[0]) if len(positions) else None
+
+    def last(
+        self, searchStrings: Union[str, Iterable[str]], excludeStrings: Union[str, Iterable[str], None] = None
+    ) -> Optional[int]:
+        """The row position of the last matching message, None if there is none"""
+        positions = self.matches(searchStrings, excludeStrings)
+        return int(positions[-1]) if len(positions) else None
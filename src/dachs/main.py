@@ -7,14 +7,14 @@ from os import environ
 from pathlib import Path
 from typing import List
 
-from mcsas3.mc_hdf import storeKVPairs
+import dachs.workbook
 
-import dachs.serialization
-import dachs.structure
 
-
-def outfileFromInput(infn, suffix="h5"):
-    return Path(infn).resolve().with_suffix(f".{suffix}")
+def outfileFromInput(infn, suffix="h5", sampleID=None):
+    infn = Path(infn).resolve()
+    if sampleID:  # one output file per sample when reading from a RoWaN log containing many samples
+        infn = infn.with_name(f"{infn.stem}_{sampleID}{infn.suffix}")
+    return infn.with_suffix(f".{suffix}")
 
 
 # perhaps, use environment vars for defaults later:
@@ -55,7 +55,8 @@ def configureParser() -> argparse.ArgumentParser:
         default=environ.get("DACHS_SOL0", ""),
         help=(
             "File containing the synthesis log of Solution 0, "
-            "read from environment variable DACHS_SOL0 if not specified on command line."
+            "read from environment variable DACHS_SOL0 if not specified on command line. "
+            "Defaults to *synlog* if that is an original RoWaN log."
         ),
     )
     parser.add_argument(
@@ -65,7 +66,8 @@ def configureParser() -> argparse.ArgumentParser:
         default=environ.get("DACHS_SOL1", ""),
         help=(
             "File containing the synthesis log of Solution 1, "
-            "read from environment variable DACHS_SOL1 if not specified on command line."
+            "read from environment variable DACHS_SOL1 if not specified on command line. "
+            "Defaults to *synlog* if that is an original RoWaN log."
         ),
     )
     parser.add_argument(
@@ -85,7 +87,28 @@ def configureParser() -> argparse.ArgumentParser:
         default=environ.get("DACHS_SYNLOG", ""),
         help=(
             "File containing the synthesis log of the MOF itself, "
-            "read from environment variable DACHS_SYNLOG if not specified on command line."
+            "read from environment variable DACHS_SYNLOG if not specified on command line. "
+            "This is either a per-sample Excel file or the original semicolon-delimited RoWaN log (*.log, *.csv)."
+        ),
+    )
+    parser.add_argument(
+        "-n",
+        "--sample",
+        type=str,
+        default=environ.get("DACHS_SAMPLE", ""),
+        help=(
+            "SampleNumber of the synthesis to read from an original RoWaN log given as *synlog*, "
+            "read from environment variable DACHS_SAMPLE if not specified on command line."
+        ),
+    )
+    parser.add_argument(
+        "-x",
+        "--experiment",
+        type=str,
+        default=environ.get("DACHS_EXPERIMENT", ""),
+        help=(
+            "ExperimentID to select from an original RoWaN log containing multiple experiments, "
+            "read from environment variable DACHS_EXPERIMENT if not specified on command line."
         ),
     )
     parser.add_argument(
@@ -107,23 +130,86 @@ def configureParser() -> argparse.ArgumentParser:
             "read from environment variable DACHS_AMSET if not specified on command line."
         ),
     )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        type=str,
+        choices=dachs.workbook.excelEngines,
+        default=environ.get("DACHS_EXCEL_ENGINE", "auto"),
+        help=(
+            "Engine for reading Excel files, 'auto' uses calamine if installed and openpyxl otherwise, "
+            "read from environment variable DACHS_EXCEL_ENGINE if not specified on command line."
+        ),
+    )
+    parser.add_argument(
+        "-r",
+        "--rawlog-layout",
+        type=str,
+        choices=("rows", "columns"),
+        default=environ.get("DACHS_RAWLOG_LAYOUT", "rows"),
+        help=(
+            "How the raw logs are stored in the HDF5 file, 'rows' stores a group for each message, 'columns' "
+            "a dataset for each column, with the repeated texts stored as codes into a list of distinct values. "
+            "Read from environment variable DACHS_RAWLOG_LAYOUT if not specified on command line."
+        ),
+    )
+    parser.add_argument(
+        "-c",
+        "--compression",
+        type=str,
+        choices=("none", "gzip", "lzf"),
+        default=environ.get("DACHS_HDF5_COMPRESSION", "none"),
+        help=(
+            "Compression of the array datasets in the HDF5 file, "
+            "read from environment variable DACHS_HDF5_COMPRESSION if not specified on command line."
+        ),
+    )
+    parser.add_argument(
+        "-g",
+        "--graph",
+        type=str,
+        choices=("svg", "none"),
+        default=environ.get("DACHS_GRAPH", "svg"),
+        help=(
+            "Renders a graph of the stored structure to an SVG file, 'none' skips it, "
+            "read from environment variable DACHS_GRAPH if not specified on command line."
+        ),
+    )
     return parser
 
 
 def main(args: List[str] = None):
     """:param args: replaces sys.argv with a custom argument list."""
     args = configureParser().parse_args(args)
+    # imported only once the arguments are valid, they take a while to load
+    import dachs.hdf5
+    import dachs.readers
+    import dachs.serialization
+    import dachs.structure
+
+    rawLogInput = dachs.readers.isRoWaNLog(args.synlog)
     if not args.outfile:
-        args.outfile = outfileFromInput(args.synlog)
+        args.outfile = outfileFromInput(args.synlog, sampleID=args.sample if rawLogInput else None)
 
     solFiles = [args.s0file, args.s1file]
+    if rawLogInput:  # solutions can be read from the same RoWaN log
+        solFiles = [fn if fn is not None else args.synlog for fn in solFiles]
     if args.s2file is not None:
         solFiles += [args.s2file]
 
-    exp = dachs.structure.create(args.logbook, solFiles, args.synlog, args.amset)
-    paths = dachs.serialization.dumpKV(exp, dbg=False)
+    exp = dachs.structure.create(
+        args.logbook,
+        solFiles,
+        args.synlog,
+        args.amset,
+        sampleID=args.sample or None,
+        experimentID=args.experiment or None,
+        engine=args.engine,
+    )
+    # the pairs are written as they are generated, collecting the graph of the structure on the way if wanted
+    pairs = dachs.serialization.iterKV(exp, dbg=False, logLayout=args.rawlog_layout)
+    graph = dachs.serialization.KVGraph() if args.graph != "none" else None
     logging.info(f"Writing structure to '{args.outfile}'.")
-    # from pprint import pprint
-    # pprint(paths)
-    storeKVPairs(args.outfile, "", paths.items())
-    dachs.serialization.graphKV(paths)
+    dachs.hdf5.writeKV(args.outfile, graph.collect(pairs) if graph else pairs, compression=args.compression)
+    if graph:
+        graph.render()
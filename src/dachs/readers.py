@@ -14,36 +14,46 @@ __status__ = "beta"
 # import numpy as np
 
 
+import heapq
+import io
 import logging
+import time
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-import chempy
 import pandas as pd
 
-from dachs import ureg
 from dachs.equipment import PV, Equipment
 from dachs.helpers import whitespaceCleanup
+from dachs.logbook import logbookCache
+from dachs.logsearch import LogQuery
 from dachs.metaclasses import ExperimentalSetupClass
 from dachs.reagent import Chemical, Reagent
-from dachs.synthesis import RawLogMessage, synthesisStep
+from dachs.synthesis import RawLogMessage, RawLogRow, RawLogTable, synthesisStep
+from dachs.units import unitCache
+from dachs.workbook import readWorkbook
 
 # from pandas import Timestamp
 
 
-def readExperimentalSetup(filename: Path, SetupName: str = "AMSET_6") -> ExperimentalSetupClass:
-    #     filename = Path("tests", "testData", "AutoMOFs_Logbook_Testing.xlsx")
-    # SetupName='AMSET_6'
-
-    assert filename.exists()
-
-    # read equipment list:
-    eq = pd.read_excel(filename, sheet_name="Equipment", index_col=None, header=0)
-    eq = eq.dropna(how="all")
+def readEquipment(filename: Path, engine: Optional[str] = None) -> Dict[str, Equipment]:
+    """
+    Reads the equipment list with their process variables (PVs) from the logbook.
+    The PVs of an equipment are listed in the rows following it, up to the next equipment or empty PV ID.
+    """
+    eq = logbookCache.sheet(filename, "Equipment", engine=engine)
+    eq = eq.dropna(how="all").reset_index(drop=True)
+    isEquipment = eq["Equipment ID"].notna()
+    # a new block starts at each equipment row and at each row without PV ID,
+    # the remaining rows of a block started by an equipment are its PVs
+    block = (isEquipment | eq["PV ID"].isna()).cumsum()
+    pvRows = eq.loc[~isEquipment & eq["PV ID"].notna()]
+    pvRecords = {}
+    for blockID, pvRec in zip(block[pvRows.index], pvRows.to_dict("records")):
+        pvRecords.setdefault(blockID, []).append(pvRec)
     eqDict = {}
-    for rowi, equip in eq.iterrows():
-        if pd.isnull(equip["Equipment ID"]):
-            continue  # skip incomplete equipment, PVs are read after each eqp
+    eqRows = eq.loc[isEquipment]
+    for blockID, equip in zip(block[eqRows.index], eqRows.to_dict("records")):
         try:
             eqItem = Equipment(
                 ID=str(equip["Equipment ID"]),
@@ -53,15 +63,12 @@ def readExperimentalSetup(filename: Path, SetupName: str = "AMSET_6") -> Experim
                 ModelName=str(equip["Model Name"]),
                 ModelNumber=str(equip["Model Number"]),
                 PriceDate=str(equip["PriceDate"]) if equip.get("PriceDate") else None,  # might not exist, optional
-                UnitPrice=ureg.Quantity(str(equip["Unit Price"]) + " " + str(equip["Price Unit"])),
-                UnitSize=ureg.Quantity(str(equip["Unit Size"]) + " " + str(equip["Unit"])),
+                UnitPrice=unitCache.parse(str(equip["Unit Price"]) + " " + str(equip["Price Unit"])),
+                UnitSize=unitCache.parse(str(equip["Unit Size"]) + " " + str(equip["Unit"])),
                 Description=equip["Description"],
                 PVs={},
             )
-            # look for PVs in the following rows
-            pvi = 1
-            while not pd.isnull(eq.iloc[rowi + pvi]["PV ID"]):
-                pvRec = eq.iloc[rowi + pvi]
+            for pvRec in pvRecords.get(blockID, []):
                 pv = PV(
                     ID=pvRec["PV ID"],
                     PVName=pvRec["PV Name"],
@@ -70,17 +77,30 @@ def readExperimentalSetup(filename: Path, SetupName: str = "AMSET_6") -> Experim
                     CalibrationOffset=pvRec["Calibration Offset"],
                 )
                 eqItem.PVs[pv.ID] = pv
-                pvi += 1
-            if not pd.isnull(eqItem.ID):
-                eqDict.update({str(equip["Equipment ID"]): eqItem})
+            eqDict.update({str(equip["Equipment ID"]): eqItem})
         except Exception as e:
             import traceback
 
             traceback.print_exception(e)
             print(f'Failure reading {equip["Equipment ID"]=}\n {str(e)}')
+    return eqDict
+
+
+def readExperimentalSetup(
+    filename: Path, SetupName: str = "AMSET_6", engine: Optional[str] = None
+) -> ExperimentalSetupClass:
+    #     filename = Path("tests", "testData", "AutoMOFs_Logbook_Testing.xlsx")
+    # SetupName='AMSET_6'
+
+    assert filename.exists()
+
+    # read equipment list, parsed once per logbook file:
+    eqDict = logbookCache.objects(
+        filename, "Equipment", lambda: readEquipment(filename, engine=engine), engine=engine
+    )
 
     # read setup configuration:
-    df = pd.read_excel(filename, sheet_name="Setup", index_col=None, header=0)
+    df = logbookCache.sheet(filename, "Setup", engine=engine)
     df = df.dropna(how="all")  # "If all values are NA, drop that row or column." - right?
     dfRow = df.loc[df.SetupID == SetupName].copy()
     assert len(dfRow == 1), f"More or less than one entry found for {SetupName=} in {filename=}"
@@ -98,44 +118,221 @@ def readExperimentalSetup(filename: Path, SetupName: str = "AMSET_6") -> Experim
     return expSetup
 
 
-def readRawMessageLog(filename: Path) -> List:
+# columns of the semicolon-delimited RoWaN log, which has no header line
+RoWaNLogColumns = ["Time", "Info", "ExperimentID", "SampleNumber", "Readout", "Value", "Unit", "Using"]
+# options for parsing it with pandas.read_csv()
+RoWaNLogCSVOptions = dict(
+    sep=";",
+    header=None,
+    names=RoWaNLogColumns,
+    dtype=str,
+    skipinitialspace=True,
+    skip_blank_lines=True,
+    engine="c",
+)
+
+
+def isRoWaNLog(filename: Path) -> bool:
+    """Tells if the given file is an original (semicolon-delimited) RoWaN log, rather than an Excel file"""
+    return Path(filename).suffix.lower() in (".log", ".csv")
+
+
+def selectRoWaNLines(
+    df: pd.DataFrame, ExperimentID: Optional[str] = None, SampleNumber: Optional[str] = None
+) -> pd.DataFrame:
+    """Keeps the lines of a RoWaN log of the given ExperimentID and/or SampleNumber (if specified)"""
+    mask = pd.Series(True, index=df.index)
+    if ExperimentID is not None:
+        mask &= df["ExperimentID"].str.strip() == str(ExperimentID).strip()
+    if SampleNumber is not None:
+        mask &= df["SampleNumber"].str.strip() == str(SampleNumber).strip()
+    return df.loc[mask]
+
+
+def readRoWaNLog(
+    filename: Path,
+    ExperimentID: Optional[str] = None,
+    SampleNumber: Optional[str] = None,
+    chunksize: int = 100000,
+    parseDates: bool = True,
+) -> pd.DataFrame:
+    """
+    Reads the original semicolon-delimited RoWaN log with the C-engine CSV parser in chunks,
+    keeping only the lines of the given ExperimentID and/or SampleNumber (if specified).
+    Returns the same columns as found in the per-sample files created by dachs.splitlogs,
+    the Time column is converted to UTC timestamps if *parseDates* is set.
+    """
+    assert filename.exists()
+    chunks = []
+    with pd.read_csv(filename, chunksize=chunksize, **RoWaNLogCSVOptions) as reader:
+        for chunk in reader:
+            chunks += [selectRoWaNLines(chunk, ExperimentID=ExperimentID, SampleNumber=SampleNumber)]
+    df = pd.concat(chunks, ignore_index=True) if len(chunks) else pd.DataFrame(columns=RoWaNLogColumns)
+    if parseDates:
+        df["Time"] = pd.to_datetime(df["Time"], utc=True)
+    return df
+
+
+def readRawLogFrame(
+    filename: Path,
+    ExperimentID: Optional[str] = None,
+    SampleNumber: Optional[str] = None,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Reads a raw log into a DataFrame, either from a per-sample file (Excel, Parquet or Feather) or directly
+    from the original RoWaN log. ExperimentID and SampleNumber select the lines to read from a RoWaN log,
+    they are ignored for per-sample files which contain a single sample only.
+    *engine* selects the excel engine for reading Excel files, see dachs.workbook.excelEngine.
+    """
     assert filename.exists()
-    df = pd.read_excel(filename, sheet_name="Sheet1", index_col=None, header=0, parse_dates=["Time"])
+    if isRoWaNLog(filename):
+        df = readRoWaNLog(filename, ExperimentID=ExperimentID, SampleNumber=SampleNumber)
+    elif filename.suffix.lower() in (".parquet", ".feather"):
+        df = pd.read_parquet(filename) if filename.suffix.lower() == ".parquet" else pd.read_feather(filename)
+        df["Time"] = pd.to_datetime(df["Time"], utc=True)
+    else:
+        df = readWorkbook(filename, "Sheet1", engine=engine, index_col=None, header=0, parse_dates=["Time"])
     df = df.dropna(how="all")
     df.sort_values(by="Time", ignore_index=True, inplace=True)
-    msgList = []
-    for idx, row in df.iterrows():
-        msgList += [
-            RawLogMessage(
-                Index=idx,
-                TimeStamp=pd.to_datetime(
-                    row["Time"], utc=True
-                ),  # .map(lambda x: x.tz_convert('Asia/Kolkata')), # unit='s',
-                MessageLevel=row["Info"],
-                ExperimentID=row["ExperimentID"],
-                SampleID=row["SampleNumber"],
-                Message=row["Readout"],
-                Unit=row["Unit"],
-                Value=row["Value"],
-                # Quantity=Q,
-                Using=row.get("Using"),  # might not exist
-            )
-        ]
-    return msgList
+    return df
+
+
+def readRawMessageLog(
+    filename: Path,
+    ExperimentID: Optional[str] = None,
+    SampleNumber: Optional[str] = None,
+    engine: Optional[str] = None,
+) -> RawLogTable:
+    df = readRawLogFrame(filename, ExperimentID=ExperimentID, SampleNumber=SampleNumber, engine=engine)
+    return rawLogTableFromFrame(df)
+
+
+def readIdentifiedRawLog(
+    filename: Path,
+    ExperimentID: Optional[str] = None,
+    SampleNumber: Optional[str] = None,
+    engine: Optional[str] = None,
+) -> Tuple[RawLogTable, Optional[str], Optional[str]]:
+    """
+    Reads a log like readRawMessageLog, parsing the file only once, and returns it together with the
+    ExperimentID and SampleNumber found in it. Each of these is None if it is not unique in the log.
+    """
+    df = readRawLogFrame(filename, ExperimentID=ExperimentID, SampleNumber=SampleNumber, engine=engine)
+
+    def uniqueValue(column: str) -> Optional[str]:
+        values = df[column].unique()
+        return values[0] if len(values) == 1 else None
+
+    return rawLogTableFromFrame(df), uniqueValue("ExperimentID"), uniqueValue("SampleNumber")
+
+
+def rawLogTableFromFrame(df: pd.DataFrame) -> RawLogTable:
+    """Turns a log read by readRawLogFrame into a RawLogTable"""
+    return RawLogTable(
+        Index=df.index,
+        TimeStamp=pd.to_datetime(df["Time"], utc=True),
+        MessageLevel=df["Info"],
+        ExperimentID=df["ExperimentID"],
+        SampleID=df["SampleNumber"],
+        Message=df["Readout"],
+        Unit=df["Unit"],
+        Value=df["Value"],
+        Using=df.get("Using"),  # might not exist
+    )
+
+
+class RawLogFollower:
+    """
+    Follows a RoWaN log while it is being written, by parsing only the lines appended since the last call
+    to *update()*. The lines of the given ExperimentID and/or SampleNumber (if specified) are appended to
+    *table*, a RawLogTable, in the order of the file. A line not terminated yet is kept until it is complete.
+
+    New rows are passed on to the callbacks registered with *subscribe()*, or can be iterated over with
+    *follow()*, which polls the file periodically.
+
+    :param filename: The RoWaN log to follow, it may not exist yet.
+    """
+
+    def __init__(self, filename: Path, ExperimentID: Optional[str] = None, SampleNumber: Optional[str] = None):
+        self.filename = Path(filename)
+        self.ExperimentID = ExperimentID
+        self.SampleNumber = SampleNumber
+        self.table = RawLogTable()
+        self.offset = 0  # position in the file up to which it was read
+        self._partialLine = b""
+        self._callbacks: List[Callable[[List[RawLogRow]], None]] = []
+
+    def subscribe(self, callback: Callable[[List[RawLogRow]], None]) -> Callable[[List[RawLogRow]], None]:
+        """Registers *callback* to be called with the list of new rows after each update which found any"""
+        self._callbacks += [callback]
+        return callback
+
+    def unsubscribe(self, callback: Callable[[List[RawLogRow]], None]) -> None:
+        self._callbacks.remove(callback)
+
+    def _readAppended(self) -> bytes:
+        if not self.filename.is_file():
+            return b""
+        if self.filename.stat().st_size < self.offset:  # truncated or replaced, start over
+            logging.warning(f"'{self.filename}' got shorter, reading it again from the start.")
+            self.table, self.offset, self._partialLine = RawLogTable(), 0, b""
+        with open(self.filename, "rb") as fh:
+            fh.seek(self.offset)
+            data = fh.read()
+        self.offset += len(data)
+        return data
+
+    def update(self) -> List[RawLogRow]:
+        """Parses the lines appended since the last update, returns the rows added to *table*"""
+        data = self._partialLine + self._readAppended()
+        lineEnd = data.rfind(b"\n") + 1
+        data, self._partialLine = data[:lineEnd], data[lineEnd:]
+        if not data.strip():
+            return []
+        df = pd.read_csv(io.BytesIO(data), **RoWaNLogCSVOptions)
+        df = selectRoWaNLines(df, ExperimentID=self.ExperimentID, SampleNumber=self.SampleNumber)
+        df = df.dropna(how="all")
+        if not len(df):
+            return []
+        df["Time"] = pd.to_datetime(df["Time"], utc=True)
+        start = len(self.table)
+        df.index = pd.RangeIndex(start, start + len(df))  # running index, as in logs read at once
+        self.table.extend(rawLogTableFromFrame(df))
+        newRows = self.table[start:]
+        for callback in list(self._callbacks):
+            callback(newRows)
+        return newRows
+
+    def follow(self, interval: float = 1.0, timeout: Optional[float] = None) -> Iterator[RawLogRow]:
+        """
+        Yields the rows of the log as they are appended, checking for new lines every *interval* seconds.
+        Stops if no new rows were found for *timeout* seconds, runs forever if *timeout* is None.
+        """
+        yield from self.table
+        lastUpdate = time.monotonic()
+        while True:
+            newRows = self.update()
+            if len(newRows):
+                lastUpdate = time.monotonic()
+                yield from newRows
+            elif timeout is not None and time.monotonic() - lastUpdate >= timeout:
+                return
+            else:
+                time.sleep(interval)
 
 
-def ReadStartingCompounds(filename) -> List:
+def ReadStartingCompounds(filename, engine: Optional[str] = None) -> List:
     assert filename.exists()
-    df = pd.read_excel(
-        filename,
-        sheet_name="Chemicals",
-        index_col=None,
-        header=0,
-        # parse_dates=["Open Date"],
-        # dayfirst=True,
-        # date_format="mixed",
-        # infer_datetime_format=True,
+    # parsed once per logbook file, a fresh copy is returned to each caller
+    return logbookCache.objects(
+        filename, "StartingCompounds", lambda: readChemicals(filename, engine=engine), engine=engine
     )
+
+
+def readChemicals(filename, engine: Optional[str] = None) -> List:
+    """Turns the chemicals listed in the logbook into a list of starting compounds"""
+    df = logbookCache.sheet(filename, "Chemicals", engine=engine)
     df = df.dropna(how="all")
     # do dates:
     df.loc[:, "Open Date"] = df.loc[:, "Open Date"].apply(
@@ -145,19 +342,14 @@ def ReadStartingCompounds(filename) -> List:
     cList = []
     for idx, row in df.iterrows():
         # print(f"{idx=}, {row=}")
-        s = chempy.Substance.from_formula(row["Formula"])
         cList += [
             Reagent(
                 ID=str(row["Reagent ID"]),
-                Chemical=Chemical(
+                Chemical=Chemical.fromFormula(  # molar mass from the formula, not row["Molar Mass"]
+                    row["Formula"],
                     ChemicalID=row["Reagent ID"],
                     ChemicalName=row["Name"],
-                    ChemicalFormula=row["Formula"],
-                    Substance=s,
-                    MolarMass=ureg.Quantity(str(s.molar_mass())).to(
-                        "g/mol"
-                    ),  # assert_unit(row["Molar Mass"], "g/mol"),
-                    Density=ureg.Quantity(str(row["Density"]) + " g/cm^3"),
+                    Density=unitCache.parse(str(row["Density"]) + " g/cm^3"),
                 ),
                 CASNumber=row["CAS-Number"],
                 Brand=row["Brand"],
@@ -209,7 +401,7 @@ def find_reagent_in_rawmessage(searchString: str, ReagentList: List[Reagent]) ->
 
 
 def find_in_log(
-    log: List[RawLogMessage],
+    log: Union[RawLogTable, List[RawLogMessage]],
     searchString: Union[str, list],
     excludeString: Union[str, list] = None,
     Highlander: bool = True,  # there can be only one if Highlander is True
@@ -218,7 +410,9 @@ def find_in_log(
 ) -> Union[RawLogMessage, list[RawLogMessage], None]:  # Optional[Union[RawLogMessage, list[RawLogMessage]]]:
     """
     Returns (the first match of) a given Reagent if its ID is found in an input string,
-    otherwise returns None
+    otherwise returns None.
+    The log can be a RawLogTable or a list of RawLogMessage. A table is searched through its LogIndex,
+    built on first use and reused by all further searches in the same table.
     """
     answers = []
     if isinstance(searchString, str):
@@ -227,18 +421,87 @@ def find_in_log(
         excludeString = []
     if isinstance(excludeString, str):
         excludeString = [excludeString]
-    for RLM in log:
-        if all(i.lower() in RLM.Message.lower() for i in searchString) and not any(
-            j.lower() in RLM.Message.lower() for j in excludeString
-        ):
-            if Highlander:
-                answers = RLM
-                if Which.lower() == "first":
-                    return RLM
-            else:
-                answers += [RLM]
+    if isinstance(log, RawLogTable):
+        positions = log.logIndex().matches(searchString, excludeString)
+        if Highlander and len(positions):
+            answers = log[int(positions[0] if Which.lower() == "first" else positions[-1])]
+        elif len(positions):
+            answers = [log[int(pos)] for pos in positions]
+    else:
+        searchLower = [i.lower() for i in searchString]
+        excludeLower = [j.lower() for j in excludeString]
+        for RLM in log:
+            message = RLM.Message.lower()
+            if all(i in message for i in searchLower) and not any(j in message for j in excludeLower):
+                if Highlander:
+                    answers = RLM
+                    if Which.lower() == "first":
+                        return answers
+                else:
+                    answers += [RLM]
     if answers == []:
         if raiseWarning:
             logging.warning(f"A message with {searchString=} and {excludeString=} was not found in the raw log.")
         return None
     return answers
+
+
+def find_many_in_log(
+    log: Union[RawLogTable, List[RawLogMessage]], queries: Dict[str, LogQuery]
+) -> Dict[str, Union[RawLogMessage, list[RawLogMessage], None]]:
+    """
+    Resolves many named queries at once, returning a dict with the result of each, as find_in_log would.
+    For a RawLogTable, each distinct search term is looked up once in the index of its messages, and the
+    messages matching it are shared by all queries using it.
+    """
+    if not isinstance(log, RawLogTable):
+        return {
+            name: find_in_log(
+                log,
+                query.searchString,
+                excludeString=query.excludeString,
+                Highlander=query.Which.lower() != "all",
+                Which=query.Which,
+                raiseWarning=query.raiseWarning,
+            )
+            for name, query in queries.items()
+        }
+    results = {}
+    for name, positions in log.logIndex().matchMany(queries).items():
+        query = queries[name]
+        if not len(positions):
+            if query.raiseWarning:
+                searchString, excludeString = query.searchString, query.excludeString or []
+                searchString = [searchString] if isinstance(searchString, str) else list(searchString)
+                excludeString = [excludeString] if isinstance(excludeString, str) else list(excludeString)
+                logging.warning(
+                    f"A message with {searchString=} and {excludeString=} was not found in the raw log."
+                )
+            results[name] = None
+        elif query.Which.lower() == "all":
+            results[name] = [log[int(pos)] for pos in positions]
+        else:
+            results[name] = log[int(positions[0] if query.Which.lower() == "first" else positions[-1])]
+    return results
+
+
+def find_reagent_masses(log: Union[RawLogTable, List[RawLogMessage]]) -> Dict[str, List[RawLogMessage]]:
+    """
+    Pairs each "ReagentID" message with the "mass of" message following it, in a single pass over the log.
+    Returns the mass messages for each reagent ID (the value of the "ReagentID" message), in order of the log.
+    """
+    if isinstance(log, RawLogTable):
+        idPositions = log.logIndex().matches("ReagentID")
+        massPositions = log.logIndex().matches("mass of")
+    else:
+        idPositions = [pos for pos, RLM in enumerate(log) if "reagentid" in RLM.Message.lower()]
+        massPositions = [pos for pos, RLM in enumerate(log) if "mass of" in RLM.Message.lower()]
+    masses, reagentID = {}, None
+    events = heapq.merge(((int(pos), 0) for pos in idPositions), ((int(pos), 1) for pos in massPositions))
+    for pos, isMass in events:
+        if not isMass:
+            reagentID = str(log[pos].Value)
+        elif reagentID is not None:
+            masses.setdefault(reagentID, []).append(log[pos])
+            reagentID = None  # one mass per reagent ID
+    return masses
@@ -4,13 +4,14 @@
 """
 A dataclass for specifying a Reagent, Reagentmixture or Product.
 """
+
 from __future__ import annotations
 
 import chempy
 from pandas import Timestamp
 
 from dachs.equipment import Equipment
-from dachs.helpers import whitespaceCleanup
+from dachs.helpers import derivedValueCache, whitespaceCleanup
 
 # from dachs.metaclasses import EnvironmentClass # to get around using Mixture typing inside the Mixture class
 
@@ -22,13 +23,17 @@ __status__ = "beta"
 
 
 import logging
-from typing import Dict, List, Optional, Union
+import operator
+from typing import Any, Callable, Dict, List, Optional, Union
 
+import numpy as np
 from attrs import Factory, define, field, validators
 
 from dachs import ureg  # get importError when using: "from . import ureg"
 from dachs.additemstoattrs import addItemsToAttrs
+from dachs.formulas import formulaCache
 from dachs.synthesis import SynthesisClass
+from dachs.units import unitCache
 
 # from dachsvalidators import isQuantity
 
@@ -85,6 +90,16 @@ class Chemical(addItemsToAttrs):
     _storeKeys: list = []  # store these keys (will be filled in later)
     _loadKeys: list = []  # load these keys from file if reconstructing
 
+    @classmethod
+    def fromFormula(cls, ChemicalFormula: str, **kwargs) -> Chemical:
+        """
+        Creates a Chemical with its Substance and MolarMass taken from the shared formula cache,
+        unless they are given explicitly.
+        """
+        kwargs.setdefault("Substance", formulaCache.substance(ChemicalFormula))
+        kwargs.setdefault("MolarMass", formulaCache.molarMass(ChemicalFormula))
+        return cls(ChemicalFormula=ChemicalFormula, **kwargs)
+
 
 @define
 class Product(addItemsToAttrs):
@@ -139,7 +154,7 @@ class Product(addItemsToAttrs):
 
 
 @define
-class Reagent(addItemsToAttrs):
+class Reagent(addItemsToAttrs, derivedValueCache):
     ID: str = field(
         default=None,
         validator=validators.instance_of(str),
@@ -201,6 +216,15 @@ class Reagent(addItemsToAttrs):
     _storeKeys: list = []  # store these keys (will be filled in later)
     _loadKeys: list = []  # load these keys from file if reconstructing
 
+    def _derivedInputs(self) -> tuple:
+        # the attributes the derived prices and moles depend on, compared by identity to find out about changes
+        chemical = self.Chemical
+        return (self.UnitPrice, self.UnitSize, chemical, chemical.Density, chemical.MolarMass)
+
+    def _memoizedPrice(self, name: str, compute) -> ureg.Quantity:
+        # derived prices, computed again when UnitPrice, UnitSize or the Chemical (Density, MolarMass) are replaced
+        return self._memoized(name, self._derivedInputs(), compute)
+
     def _CheckForDensity(self):
         assert self.Chemical.Density is not None, logging.warning("Chemical.Density must be provided")
         return
@@ -219,27 +243,37 @@ class Reagent(addItemsToAttrs):
 
     # @property
     def PricePerUnit(self) -> ureg.Quantity:
+        return self._memoizedPrice("PricePerUnit", self._PricePerUnit)
+
+    def _PricePerUnit(self) -> ureg.Quantity:
         self._CheckForPriceCalc()
         return self.UnitPrice / self.UnitSize
 
     # @property
     def price_per_mass(self) -> Union[ureg.Quantity, None]:
+        return self._memoizedPrice("price_per_mass", self._price_per_mass)
+
+    def _price_per_mass(self) -> Union[ureg.Quantity, None]:
         self._CheckForPriceCalc()
         if self.UnitSize.check("[mass]"):
             return self.PricePerUnit()
         elif self.UnitSize.check("[volume]"):
-            return (self.PricePerUnit() / self.Chemical.Density).to("euro/g")
+            return unitCache.convert(self.PricePerUnit() / self.Chemical.Density, "euro/g")
         else:
             logging.warning(f"Price per mass cannot be calculated from {self.PricePerUnit=}")
             return None
 
     # @property
     def PricePerMole(self) -> ureg.Quantity:
+        return self._memoizedPrice("PricePerMole", self._PricePerMole)
+
+    def _PricePerMole(self) -> ureg.Quantity:
         self._CheckForMolarMass()
+        pricePerMass = self.price_per_mass()
         assert (
-            self.price_per_mass() is not None
+            pricePerMass is not None
         ), "Price per mole cannot be calculated as price per mass cannot be calculated"
-        return (self.price_per_mass() * self.Chemical.MolarMass).to("euro/mole")
+        return unitCache.convert(pricePerMass * self.Chemical.MolarMass, "euro/mole")
 
     def MolesByMass(self, mass: ureg.Quantity) -> ureg.Quantity:
         self._CheckForDensity()
@@ -254,7 +288,7 @@ class Reagent(addItemsToAttrs):
 
 
 @define
-class Mixture(addItemsToAttrs):
+class Mixture(addItemsToAttrs, derivedValueCache):
     """This class supersedes the ReagentMixture class, and allows Mixtures of Reagents as well as Mixtures of
     Mixtures."""
 
@@ -321,17 +355,133 @@ class Mixture(addItemsToAttrs):
     _storeKeys: list = []  # store these keys (will be filled in later)
     _loadKeys: list = []  # load these keys from file if reconstructing
 
+    def _composition(self) -> Dict[str, Any]:
+        """
+        The indices of the components by ID, the mass of each ID in gram and vectors of a value per component,
+        such as its moles. Kept up to date by add_reagent_to_mix and add_mixture_to_mix, which update only the
+        entries of the component added. Built again when ComponentList or ComponentMasses were replaced or grown
+        directly, or a component replaced. A mass replaced directly, or the price, size or chemical of a
+        component, is found by comparing their identity with the values the entries were computed from.
+        """
+        composition = self._derivedCache().get("composition")
+        if (
+            composition is None
+            or composition["components"] is not self.ComponentList
+            or composition["masses"] is not self.ComponentMasses
+            or composition["length"] != len(self.ComponentList)
+            or len(composition["massValues"]) != len(self.ComponentMasses)
+        ):
+            byID: Dict[str, List[int]] = {}
+            for i, component in enumerate(self.ComponentList):
+                byID.setdefault(component.ID, []).append(i)
+            composition = dict(
+                components=self.ComponentList,
+                masses=self.ComponentMasses,
+                length=len(self.ComponentList),
+                massValues=list(self.ComponentMasses.values()),
+                byID=byID,
+                grams={ID: mass.m_as("gram") for ID, mass in self.ComponentMasses.items()},
+                inputs=[(component,) + component._derivedInputs() for component in self.ComponentList],
+                vectors={},  # unit: (compute, list of magnitudes)
+            )
+            self._derivedCache()["composition"] = composition
+            return composition
+        if not all(map(operator.is_, composition["massValues"], self.ComponentMasses.values())):
+            changed = [
+                ID
+                for (ID, mass), previous in zip(self.ComponentMasses.items(), composition["massValues"])
+                if mass is not previous
+            ]
+            for ID in changed:
+                self._componentChanged(composition, ID)
+        for i, component in enumerate(self.ComponentList):
+            inputs = (component,) + component._derivedInputs()
+            if not all(map(operator.is_, inputs, composition["inputs"][i])):
+                if inputs[0] is not composition["inputs"][i][0]:  # another component, maybe of another ID
+                    del self._derivedCache()["composition"]
+                    return self._composition()
+                composition["inputs"][i] = inputs
+                self._updateEntries(composition, [i])
+        return composition
+
+    def _componentValue(
+        self, i: int, unit: str, compute: Callable[[Reagent, ureg.Quantity], ureg.Quantity]
+    ) -> float:
+        component = self.ComponentList[i]
+        return unitCache.convert(compute(component, self.ComponentMasses[component.ID]), unit).magnitude
+
+    def _componentChanged(self, composition: Dict[str, Any], ID: str) -> None:
+        """Updates the entries of the components with *ID* after their mass changed or one was added"""
+        composition["massValues"] = list(self.ComponentMasses.values())
+        composition["grams"][ID] = self.ComponentMasses[ID].m_as("gram")
+        self._updateEntries(composition, composition["byID"].get(ID, []))
+
+    def _updateEntries(self, composition: Dict[str, Any], indices: List[int]) -> None:
+        for unit, (compute, values) in composition["vectors"].items():
+            for i in indices:
+                values[i] = self._componentValue(i, unit, compute)
+
+    def _componentAdded(self, composition: Dict[str, Any], component: Reagent) -> None:
+        composition["byID"].setdefault(component.ID, []).append(composition["length"])
+        composition["inputs"].append((component,) + component._derivedInputs())
+        composition["length"] += 1
+        for _, values in composition["vectors"].values():
+            values.append(None)
+        self._componentChanged(composition, component.ID)
+
+    def _massVector(self) -> np.ndarray:
+        """The masses in ComponentMasses in gram"""
+        grams = self._composition()["grams"]
+        return np.fromiter(grams.values(), dtype=float, count=len(grams))
+
+    def _componentVector(
+        self, unit: str, compute: Callable[[Reagent, ureg.Quantity], ureg.Quantity]
+    ) -> np.ndarray:
+        """The magnitudes in *unit* of compute(component, mass) for each entry in ComponentList"""
+        vectors = self._composition()["vectors"]
+        if unit not in vectors:  # computed for all components on first use, updated on adding components
+            vectors[unit] = (
+                compute,
+                [self._componentValue(i, unit, compute) for i in range(len(self.ComponentList))],
+            )
+        return np.array(vectors[unit][1], dtype=float)
+
+    def _moleVector(self) -> np.ndarray:
+        return self._componentVector("mole", lambda component, mass: component.MolesByMass(mass))
+
+    def _matchingComponents(self, composition: Dict[str, Any], MatchComponent: Any) -> List[int]:
+        # equal components have the same ID, only those are compared
+        candidates = composition["byID"].get(getattr(MatchComponent, "ID", None), [])
+        return [
+            i
+            for i in candidates
+            if self.ComponentList[i] is MatchComponent or self.ComponentList[i] == MatchComponent
+        ]
+
     def component_concentrations(self) -> List[ureg.Quantity]:
         # returns a list of mole concentrations of the Reagents
-        return [self.component_concentration(MatchComponent=i).to("mole/mole") for i in self.ComponentList]
+        moles = self._moleVector()
+        totalMoles = moles.sum()
+        # the moles of all components equal to each component, grouped once among the components of an ID
+        matchingMoles = np.empty(len(moles))
+        for indices in self._composition()["byID"].values():
+            while len(indices):
+                first = self.ComponentList[indices[0]]
+                group = [i for i in indices if self.ComponentList[i] is first or self.ComponentList[i] == first]
+                matchingMoles[group] = moles[group].sum()
+                indices = [i for i in indices if i not in group]
+        return [ureg.Quantity(float(m / totalMoles), "mole/mole") for m in matchingMoles]
 
     def add_reagent_to_mix(self, reag: Reagent, ReagentMass: ureg.Quantity) -> None:
         """Adds a reagent to the mixture"""
-        if reag not in self.ComponentList:
+        composition = self._composition()
+        if not len(self._matchingComponents(composition, reag)):
             self.ComponentList += [reag]
             self.ComponentMasses[reag.ID] = ReagentMass
+            self._componentAdded(composition, reag)
         else:
             self.ComponentMasses[reag.ID] += ReagentMass
+            self._componentChanged(composition, reag.ID)
 
         self.DetailedDescription += f"{ReagentMass:.2f~P} of {reag.Chemical.ChemicalName}, and "
         # mark the reagent as actually in use:
@@ -360,12 +510,15 @@ class Mixture(addItemsToAttrs):
             AddMixtureMass <= mix.total_mass
         ), "Sanity check failed, you are adding more mass of mixture than existed in the mixture."
         MassFractionOfTotal = (AddMixtureMass / mix.total_mass).to("gram/gram")
+        composition = self._composition()
         for ci, component in enumerate(mix.ComponentList):
-            if component not in self.ComponentList:
+            if not len(self._matchingComponents(composition, component)):
                 self.ComponentList += [component]
                 self.ComponentMasses[component.ID] = mix.ComponentMasses[component.ID] * MassFractionOfTotal
+                self._componentAdded(composition, component)
             else:
                 self.ComponentMasses[component.ID] += mix.ComponentMasses[component.ID] * MassFractionOfTotal
+                self._componentChanged(composition, component.ID)
 
         if AddMixtureVolume is not None:
             self.DetailedDescription += (
@@ -378,21 +531,17 @@ class Mixture(addItemsToAttrs):
         return
 
     def component_moles(self, MatchComponent: Reagent) -> ureg.Quantity:
-        componentMoles = 0
-        for ci, component in enumerate(self.ComponentList):
-            theseMoles = component.MolesByMass(self.ComponentMasses[component.ID])
-            if component == MatchComponent:
-                componentMoles += theseMoles
+        moles = self._moleVector()
+        matches = self._matchingComponents(self._composition(), MatchComponent)
+        componentMoles = ureg.Quantity(float(moles[matches].sum()), "mole") if len(matches) else 0
         if componentMoles == 0:
             logging.warning(f"Concentration of {MatchComponent=} is zero, component not found")
         return componentMoles
 
     def total_moles(self) -> ureg.Quantity:
-        totalMoles = 0
-        for ci, component in enumerate(self.ComponentList):
-            theseMoles = component.MolesByMass(self.ComponentMasses[component.ID])
-            totalMoles += theseMoles
-        return totalMoles
+        if not len(self.ComponentList):
+            return 0
+        return ureg.Quantity(float(self._moleVector().sum()), "mole")
 
     def component_concentration(self, MatchComponent: Reagent) -> float:
         """
@@ -404,19 +553,18 @@ class Mixture(addItemsToAttrs):
     @property
     def total_mass(self) -> ureg.Quantity:
         # returns the total mass of the mixture
-        TMass = ureg.Quantity("0 gram")
-        for mass in self.ComponentMasses.values():
-            TMass += mass
-        return TMass
+        if not len(self.ComponentMasses):
+            return ureg.Quantity("0 gram")
+        return ureg.Quantity(float(self._massVector().sum()), "gram")
 
     @property
     def total_price(self) -> ureg.Quantity:
         # returns the total cost of the miture
         # assert False, 'Price calculation Not implemented yet.'
-        TPrice = 0
-        for ci, component in enumerate(self.ComponentList):
-            TPrice += component.price_per_mass() * self.ComponentMasses[component.ID]
-        return TPrice
+        if not len(self.ComponentList):
+            return 0
+        prices = self._componentVector("EUR", lambda component, mass: component.price_per_mass() * mass)
+        return ureg.Quantity(float(prices.sum()), "EUR")
 
     def price_per_mass(self) -> ureg.Quantity:
         # assert False, 'Price calculation Not implemented yet.'
@@ -11,104 +11,218 @@ __license__ = "GPLv3+"
 __date__ = "2023/02/07"
 __status__ = "beta"
 
+import os
 import xml.etree.ElementTree
 from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
 
-import graphviz
+import numpy as np
+import pandas as pd
+
+from dachs.synthesis import RawLogMessage, RawLogRow, RawLogTable
+
+# how raw logs are stored: a group for each message, or a dataset for each column
+rawLogLayouts = ("rows", "columns")
+# types stored under the name of the type they stand in for, keeps the file schema of a list of messages
+storedTypes = {RawLogRow: RawLogMessage, RawLogTable: list}
+
+
+def typeName(cls: type) -> str:
+    return ".".join((cls.__module__, cls.__name__))
 
 
 def type2str(obj):
-    return ".".join((type(obj).__module__, type(obj).__name__))
+    return typeName(storedTypes.get(type(obj), type(obj)))
 
 
-def dumpKV(obj: object, path: PurePosixPath = None, lvl: int = 0, dbg: bool = False):
-    """Serializes the given hierarchical DACHS structure as key-value pairs (a dict).
+def rawLogLayout(layout: Optional[str] = None) -> str:
+    """The layout for storing raw logs: *layout* if given, the environment variable DACHS_RAWLOG_LAYOUT, or rows"""
+    layout = (layout or os.environ.get("DACHS_RAWLOG_LAYOUT", "") or "rows").lower()
+    if layout not in rawLogLayouts:
+        raise ValueError(f"Unknown raw log layout {layout=}, choose from {rawLogLayouts}")
+    return layout
+
+
+def rawLogColumnsKV(table: RawLogTable, path: PurePosixPath) -> dict:
+    """
+    Serializes a raw log as one dataset per column, much smaller than a group per message for large logs.
+    The text columns are stored as codes into a dataset of their distinct values (categories), with -1 for
+    missing values. Value is split in a number (NaN if none) and a categorical text column.
+    """
+    pathlst = {path / "type": typeName(RawLogTable), path / "layout": "columns"}
+    pathlst[path / "Index"] = np.array(table.column("Index"))
+    epoch = pd.Timestamp(0, tz="UTC")
+    pathlst[path / "TimeStamp"] = (table.column("TimeStamp") - epoch).total_seconds().to_numpy()
+
+    def categorical(name: str, codes: np.ndarray, categories: list) -> None:
+        pathlst[path / name / "type"] = typeName(pd.Categorical)
+        present = [i for i, category in enumerate(categories) if category is not None]
+        remap = np.full(len(categories) + 1, -1, dtype=np.int32)  # missing values get -1, and keep it
+        remap[present] = np.arange(len(present), dtype=np.int32)
+        pathlst[path / name / "codes"] = remap[codes]
+        pathlst[path / name / "categories"] = np.array([str(categories[i]) for i in present], dtype=object)
+
+    for name in table.categoricalColumns:
+        categorical(name, *table.categorical(name))
+    values = table.column("Value")
+    isNumber = np.fromiter((isinstance(val, (int, float)) for val in values), dtype=bool, count=len(values))
+    numbers = np.full(len(values), np.nan)
+    numbers[isNumber] = values[isNumber].astype(float)
+    pathlst[path / "Value" / "type"] = type2str(dict())
+    pathlst[path / "Value" / "number"] = numbers
+    texts = np.empty(len(values), dtype=object)
+    texts[:] = [None if number or val is None else str(val) for val, number in zip(values, isNumber)]
+    codes, categories = pd.factorize(texts, use_na_sentinel=True)
+    categorical("Value/text", codes, list(categories))
+    return pathlst
+
+
+def childrenOf(obj: object) -> Optional[Iterator[Tuple[Any, object]]]:
+    """The (name, child) pairs of *obj* to traverse, or None if it is a leaf to store as a value"""
+    storeKeys = getattr(obj, "_storeKeys", [])
+    if len(storeKeys):
+        return ((storeKey, getattr(obj, storeKey)) for storeKey in storeKeys)
+    if type(obj) in (list, tuple, RawLogTable) and len(obj):
+        return enumerate(obj)
+    if type(obj) in (dict,) and len(obj):
+        return iter(obj.items())
+    return None
+
 
-    :param objlst: A hierarchical instance for traversal.
+def childPaths(
+    path: PurePosixPath, children: Iterator[Tuple[Any, object]]
+) -> Iterator[Tuple[PurePosixPath, object]]:
+    # translate children path names from type names to their stored ID
+    for num, child in children:
+        yield path / str(getattr(child, "ID", num)), child
+
+
+def iterKV(
+    obj: object, path: PurePosixPath = None, lvl: int = 0, dbg: bool = False, logLayout: Optional[str] = None
+) -> Iterator[Tuple[PurePosixPath, Any]]:
+    """Serializes the given hierarchical DACHS structure as key-value pairs, yielded one at a time.
+
+    The structure is walked depth-first without recursion, keeping one iterator over the children of each
+    level. Memory use thus depends on the depth of the structure, not on its size, and the pairs can be
+    written while the walk goes on. The pairs come in the same order as in *dumpKV()*, the type of each
+    node before its children.
+
+    :param obj: A hierarchical instance for traversal.
     :param path: Optional, a word to prepend to all generated keys, a top-level name.
         It is replaced by the *ID* attribute if available.
-    :param lvl: The current level of invocation, tracks the recursion depth for debugging.
+    :param lvl: The indentation level of the debug output.
     :param dbg: Enable debug output.
+    :param logLayout: How raw logs are stored, 'rows' or 'columns', see *rawLogLayout()*.
     """
-    indent = "".join(["  " for _ in range(lvl)])
-    if dbg:
-        from pprint import pformat
-
-        print(indent, f"{obj=}")
+    logLayout = rawLogLayout(logLayout)
     if not path:  # may be undefined for the top-level object
         path = getattr(obj, "ID", None)
     path = PurePosixPath(path) if path else PurePosixPath("")
-    if dbg:
-        print(indent, f"path from id: '{path}', {type(obj)}")
-
-    # find any children to traverse
-    children = [(storeKey, getattr(obj, storeKey)) for storeKey in getattr(obj, "_storeKeys", [])]
-    if not len(children):
-        if type(obj) in (list, tuple):
-            children = list(enumerate(obj))
-        if type(obj) in (dict,):
-            children = list(obj.items())
-    # translate children path names from type names to their stored ID
-    children = [(getattr(child, "ID", num), child) for num, child in children]
-    if dbg:
-        print(indent, f"{children=}")
-    if not len(children):  # no children found
-        # omit this object if empty? TODO
-        return {path: obj}
-    # first store some meta info for later graphKV stage extended info
-    pathlst = {path / "type": type2str(obj)}
-    for name, child in children:
+    levels = [iter(((path, obj),))]
+    while levels:
+        entry = next(levels[-1], None)
+        if entry is None:  # all children of this level done
+            levels.pop()
+            continue
+        path, obj = entry
         if dbg:
-            print(indent, f"{lvl}>", name)
-        subpath = path / str(name)
-        items = dumpKV(child, subpath, lvl + 1, dbg=dbg)
-        if dbg:
-            indentCount = (lvl + 1) * 2 + 1
-            print(indent, f"{lvl}<{{" + pformat(items, indent=indentCount, width=120)[1:].lstrip())
-        pathlst.update(items)
-    return pathlst
+            print("".join(["  " for _ in range(lvl + len(levels) - 1)]), f"'{path}': {type(obj)}")
+        if type(obj) is RawLogTable and logLayout == "columns":
+            yield from rawLogColumnsKV(obj, path).items()
+            continue
+        children = childrenOf(obj)
+        if children is None:  # no children found
+            # omit this object if empty? TODO
+            yield path, obj
+            continue
+        # first store some meta info for later graphKV stage extended info
+        yield path / "type", type2str(obj)
+        levels.append(childPaths(path, children))
+
+
+def dumpKV(
+    obj: object, path: PurePosixPath = None, lvl: int = 0, dbg: bool = False, logLayout: Optional[str] = None
+) -> Dict[PurePosixPath, Any]:
+    """Serializes the given hierarchical DACHS structure as key-value pairs (a dict).
+    Collects the pairs of *iterKV()*, see there for the arguments."""
+    return dict(iterKV(obj, path, lvl=lvl, dbg=dbg, logLayout=logLayout))
 
 
-def graphKV(paths):
-    docsPath = Path("dist/docs/reference/autosummary")
-    graphName = list(paths.keys())[0].parts[0]
-
-    # pprint.pprint(paths, width=120)
-    def nodeFromParts(parts, i, paths):
-        node = PurePosixPath(*parts[: i + 1])
-        try:
-            return node, paths[node / "type"]
-        except KeyError:
-            return node, type2str(paths[node])
-
-    nodes = dict(
-        nodeFromParts(path.parts, i, paths)
-        for path in paths
-        for i in range(len(path.parts))
-        if path.parts[-1] != "type"  # filter type info, evaluated for node type info
-    )
-    edges = {
-        (PurePosixPath(*path.parts[: i + 1]), PurePosixPath(*path.parts[: i + 2]))
-        for path in paths
-        for i in range(len(path.parts) - 1)
-        if path.parts[-1] != "type"  # filter type info, evaluated for node type info
-    }
-    graph = graphviz.Digraph(graphName, format="svg", graph_attr=dict(rankdir="LR"))
-
-    def sanitize(name):
-        return str(name).replace(":", ".")
-
-    for nodepath, nodetype in nodes.items():
-        lbl = f"{nodepath.name}({nodetype.split('.')[-1]})"
-        url, color = "", ""
-        if nodetype.startswith("dachs."):
-            url = docsPath / (nodetype + ".html")
-            color = "blue"
-        graph.node(sanitize(nodepath), label=lbl, URL=str(url), fontcolor=color)
-    for tail, head in edges:
-        graph.edge(sanitize(tail), sanitize(head))
-    outfn = graph.render(graph.name, cleanup=True)
-    fixSVG(outfn)
+class KVGraph:
+    """
+    Collects the nodes and edges of a graph of the serialized structure from its key-value pairs, one pair at a
+    time, and renders it with graphviz. The type of a node is taken from its 'type' entry, which comes before
+    its children, or from the type of its value otherwise. The numbered items of a list, such as the messages
+    of a raw log, share a single node *itemName*, so the graph grows with the schema, not with the data.
+    """
+
+    itemName = "[i]"
+
+    def __init__(self):
+        self.name = None
+        self.nodes: Dict[PurePosixPath, str] = {}
+        self.edges: Set[Tuple[PurePosixPath, PurePosixPath]] = set()
+        self._types: Dict[PurePosixPath, str] = {}
+
+    def schemaPath(self, path: PurePosixPath) -> PurePosixPath:
+        """*path* with the numbers of list items replaced by *itemName*"""
+        node = PurePosixPath(*path.parts[:1])
+        for part in path.parts[1:]:
+            if part.isdigit() and self._types.get(node) in (typeName(list), typeName(tuple)):
+                part = self.itemName
+            node = node / part
+        return node
+
+    def add(self, path: PurePosixPath, value: Any) -> None:
+        if self.name is None:
+            self.name = path.parts[0]
+        path = self.schemaPath(path)
+        if path.name == "type":  # type info, evaluated for node type info
+            self._types[path.parent] = value
+            return
+        parent = None
+        for i in range(len(path.parts)):
+            node = PurePosixPath(*path.parts[: i + 1])
+            if node not in self.nodes:
+                self.nodes[node] = self._types[node] if node in self._types else type2str(value)
+            if parent is not None:
+                self.edges.add((parent, node))
+            parent = node
+
+    def collect(self, pairs: Iterable[Tuple[PurePosixPath, Any]]) -> Iterator[Tuple[PurePosixPath, Any]]:
+        """Adds each of the key-value *pairs* to the graph while passing it on, for writing it at the same time"""
+        for path, value in pairs:
+            self.add(path, value)
+            yield path, value
+
+    def render(self) -> None:
+        docsPath = Path("dist/docs/reference/autosummary")
+        import graphviz  # only needed here, importing it at startup is slow
+
+        graph = graphviz.Digraph(self.name, format="svg", graph_attr=dict(rankdir="LR"))
+
+        def sanitize(name):
+            return str(name).replace(":", ".")
+
+        for nodepath, nodetype in self.nodes.items():
+            lbl = f"{nodepath.name}({nodetype.split('.')[-1]})"
+            url, color = "", ""
+            if nodetype.startswith("dachs."):
+                url = docsPath / (nodetype + ".html")
+                color = "blue"
+            graph.node(sanitize(nodepath), label=lbl, URL=str(url), fontcolor=color)
+        for tail, head in self.edges:
+            graph.edge(sanitize(tail), sanitize(head))
+        outfn = graph.render(graph.name, cleanup=True)
+        fixSVG(outfn)
+
+
+def graphKV(paths: Union[Dict[PurePosixPath, Any], Iterable[Tuple[PurePosixPath, Any]]]) -> None:
+    """Renders the graph of the serialized structure from a dict of key-value pairs or an iterable of pairs"""
+    graph = KVGraph()
+    for path, value in paths.items() if isinstance(paths, dict) else paths:
+        graph.add(path, value)
+    graph.render()
 
 
 def fixSVG(fn):
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Splits the raw RoWaN logs into separate files, one file per sample.
+The log is grouped by ExperimentID and SampleNumber in a single pass, the resulting shards are written
+concurrently in one or more of the formats xlsx, csv, parquet or feather.
+"""
+
+__author__ = "Brian R. Pauw"
+__contact__ = "brian@stack.nl"
+__license__ = "GPLv3+"
+__date__ = "2023/02/24"
+__status__ = "beta"
+
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from dachs.readers import RoWaNLogColumns, readRoWaNLog
+
+# supported output formats and the suffix of the files written
+shardFormats = {"xlsx": ".xlsx", "csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+# the modules pandas imports on first use of each writer, imported before starting the writer threads:
+# importing them from several threads at once fails occasionally (SystemError from the import machinery)
+shardWriterModules = {
+    "xlsx": ("openpyxl", "pandas.io.formats.excel"),
+    "csv": ("pandas.io.formats.csvs",),
+    "parquet": ("pyarrow.parquet",),
+    "feather": ("pyarrow.feather",),
+}
+
+
+def importWriters(formats: Sequence[str]) -> None:
+    for fmt in formats:
+        for module in shardWriterModules[fmt]:
+            importlib.import_module(module)
+
+
+def inferNumericColumns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The log with numbers for the columns containing only numbers, as pandas.read_csv() infers them by default,
+    for storing them as numbers in Excel files rather than as text.
+    """
+    df = df.copy()
+    for column in df.columns:
+        try:
+            df[column] = pd.to_numeric(df[column])
+        except (ValueError, TypeError):  # any text in it, kept as is
+            pass
+    return df
+
+
+def shardHash(df: pd.DataFrame) -> str:
+    """A hash of the rows of a shard, for finding out if it changed since the previous run"""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def writeShard(df: pd.DataFrame, filename: Path, fmt: str) -> Path:
+    """Writes the rows of a single sample to *filename* in the given format"""
+    tmpfn = filename.with_name(filename.name + ".tmp")
+    if fmt == "xlsx":
+        df.to_excel(tmpfn, index=False, engine="openpyxl")
+    elif fmt == "csv":  # same layout as the original RoWaN log, so it can be read by readRawMessageLog
+        df.to_csv(tmpfn, sep=";", header=False, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(tmpfn, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(tmpfn)
+    else:
+        raise ValueError(f"Unsupported output format {fmt=}, choose from {list(shardFormats)}")
+    os.replace(tmpfn, filename)  # replaces an existing file, never leaves a partial one
+    return filename
+
+
+def splitLog(
+    filename: Path,
+    outDir: Optional[Path] = None,
+    formats: Sequence[str] = ("xlsx",),
+    incremental: bool = False,
+    workers: Optional[int] = None,
+) -> List[Path]:
+    """
+    Splits the RoWaN log *filename* into one file per ExperimentID and SampleNumber, named
+    log_<ExperimentID>_<SampleNumber>.<format> in *outDir* (default: the directory of the log).
+
+    :param formats: One or more output formats, see *shardFormats*.
+    :param incremental: Only (re)write the shards whose rows changed since the previous run, as recorded in a
+        manifest file next to the shards. Shards of new samples are always written.
+    :param workers: Number of concurrent writers, defaults to a number based on the available CPUs.
+    :returns: The list of files written.
+    """
+    for fmt in formats:
+        if fmt not in shardFormats:
+            raise ValueError(f"Unsupported output format {fmt=}, choose from {list(shardFormats)}")
+    filename = Path(filename)
+    outDir = Path(outDir) if outDir is not None else filename.parent
+    outDir.mkdir(parents=True, exist_ok=True)
+    manifestFile = outDir / f".{filename.stem}_shards.json"
+    manifest: Dict[str, str] = {}
+    if incremental and manifestFile.is_file():
+        manifest = json.loads(manifestFile.read_text())
+
+    df = readRoWaNLog(filename, parseDates=False)
+    numericDf = inferNumericColumns(df) if "xlsx" in formats else df
+    jobs, newManifest = [], {}
+    # a single pass over the log for all samples
+    for (expID, sampleID), shard in df.groupby(["ExperimentID", "SampleNumber"], sort=False):
+        shard = shard[RoWaNLogColumns]
+        digest = shardHash(shard)
+        logging.info(f"working on {expID=}, {sampleID=}, number of lines: {len(shard)}")
+        for fmt in formats:
+            outfn = outDir / f"log_{str(expID).strip()}_{str(sampleID).strip()}{shardFormats[fmt]}"
+            newManifest[outfn.name] = digest
+            if incremental and manifest.get(outfn.name) == digest and outfn.is_file():
+                continue  # unchanged since the last run
+            # Excel files keep numbers as numbers, like the files written by the former SplitRoWaNLogs script
+            jobs += [(numericDf.loc[shard.index, RoWaNLogColumns] if fmt == "xlsx" else shard, outfn, fmt)]
+
+    importWriters({fmt for _, _, fmt in jobs})
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        written = list(executor.map(lambda job: writeShard(*job), jobs))
+    manifestFile.write_text(json.dumps(newManifest, indent=1, sort_keys=True))
+    return written
+
+
+def configureParser() -> argparse.ArgumentParser:
+    def validate_file(arg):
+        if (file := Path(arg).absolute()).is_file():
+            return file
+        else:
+            raise FileNotFoundError(arg)
+
+    # process input arguments
+    parser = argparse.ArgumentParser(
+        prog=f"{__package__}.splitlogs",
+        description="""
+            Converts the raw RoWaN logs to split files, one file per sample.
+            """,
+    )
+    parser.add_argument(
+        "-f",
+        "--filename",
+        type=validate_file,
+        help="Path to the raw RoWaN log file to split",
+        required=True,
+    )
+    parser.add_argument(
+        "-o",
+        "--outdir",
+        type=Path,
+        default=None,
+        help="Output directory for the split files, defaults to the directory of the log file",
+    )
+    parser.add_argument(
+        "-t",
+        "--format",
+        choices=list(shardFormats),
+        nargs="+",
+        default=["xlsx"],
+        help="One or more output formats, parquet and feather require the pyarrow package",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="Only rewrite files of samples whose log lines changed since the previous run",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of files written concurrently, defaults to a number based on the available CPUs",
+    )
+    return parser
+
+
+def main(args: List[str] = None):
+    """:param args: replaces sys.argv with a custom argument list."""
+    logging.basicConfig(level=logging.INFO)
+    args = configureParser().parse_args(args)
+    written = splitLog(
+        args.filename, outDir=args.outdir, formats=args.format, incremental=args.incremental, workers=args.workers
+    )
+    print(f"Wrote {len(written)} files.")
+
+
+if __name__ == "__main__":
+    main()
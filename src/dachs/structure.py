@@ -8,10 +8,19 @@ import chempy  # we only need a tiny bit, but it does offer options...
 import pandas as pd
 
 from dachs import ureg
+from dachs.logsearch import LogQuery
 from dachs.metaclasses import ChemicalsClass, Experiment
-from dachs.readers import ReadStartingCompounds, find_in_log, readExperimentalSetup, readRawMessageLog
+from dachs.readers import (
+    ReadStartingCompounds,
+    find_many_in_log,
+    find_reagent_masses,
+    isRoWaNLog,
+    readExperimentalSetup,
+    readIdentifiedRawLog,
+)
 from dachs.reagent import Chemical, Mixture, Product
 from dachs.synthesis import DerivedParameter, RawLogMessage, SynthesisClass
+from dachs.units import unitCache
 
 
 def DParFromLogEntry(ID: str, ParameterName: str, Description: str, LogEntry: RawLogMessage):
@@ -45,7 +54,15 @@ def setupLogging(outLogFilePathBase: Path):
         print("   ", lh)
 
 
-def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None) -> Experiment:
+def create(
+    logFile: Path,
+    solFiles: List[Path],
+    synFile: Path,
+    amset: str = None,
+    sampleID: str = None,
+    experimentID: str = None,
+    engine: str = None,
+) -> Experiment:
     """
     Construction of a test structure from Glen's excel files using the available dataclasses,
     the hope is to use this as a template to construct the ontology, then write the structure to HDF5 files.
@@ -62,32 +79,36 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
     :param logFile: Path to the robot log book Excel file
     :param solFiles: One or more Excel files describing the base solutions which were mixed by the robot
     :param synFile: The synthesis robot log file.
+    :param amset: The equipment set AMSET identifier, used if not found in the synthesis log.
+    :param sampleID: The SampleNumber to read from *synFile*, if it is an original (semicolon-delimited)
+        RoWaN log instead of a per-sample Excel file. Solution logs read from a RoWaN log are selected by
+        their position in *solFiles*, as SampleNumber Solution0, Solution1, ...
+    :param experimentID: Optional ExperimentID to select from RoWaN logs containing multiple experiments.
+    :param engine: The engine for reading Excel files, see dachs.workbook.excelEngine.
     """
-    setupLogging(Path(synFile.parent, synFile.stem))
+    logBase = Path(synFile.parent, synFile.stem)
+    if isRoWaNLog(synFile):
+        assert sampleID is not None, "A sampleID is required for reading the synthesis from a RoWaN log"
+        logBase = Path(synFile.parent, f"{synFile.stem}_{sampleID}")
+    setupLogging(logBase)
     logging.info(f"Working in '{os.getcwd()}'.")
 
     # define a ZIF 8 Chemical, we'll need this later:
-    z8 = chempy.Substance.from_formula("C8H10N4Zn")
-    zifChemical = Chemical(
+    zifChemical = Chemical.fromFormula(
+        "C8H10N4Zn",
         ChemicalID="ZIF-8",
         ChemicalName="Zeolitic Imidazolate Framework 8",
-        ChemicalFormula="C8H10N4Zn",
-        Substance=z8,
-        MolarMass=ureg.Quantity(str(z8.molar_mass())),
-        Density=ureg.Quantity("0.9426 g/cc"),
+        Density=unitCache.parse("0.9426 g/cc"),
         SourceDOI="10.1038/s42004-021-00613-z",
         SpaceGroup="I-43m",
     )
 
     # define a ZIF L Chemical, we'll need these later too:
-    zl = chempy.Substance.from_formula("C24H38N12O3Zn2")
-    zifLChemical = Chemical(
+    zifLChemical = Chemical.fromFormula(
+        "C24H38N12O3Zn2",
         ChemicalID="ZIF-L",
         ChemicalName="Zeolitic Imidazolate Framework L",
-        ChemicalFormula="C24H38N12O3Zn2",
-        Substance=zl,
-        MolarMass=ureg.Quantity(str(zl.molar_mass())),
-        Density=ureg.Quantity("1.4042 g/cc"),
+        Density=unitCache.parse("1.4042 g/cc"),
         SourceDOI="10.1038/s42004-021-00613-z",
         SpaceGroup="Cmca",
     )
@@ -129,7 +150,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         # in this experiment, we are going to use some chemicals. These are defined by the chemicals class.
         Chemicals=ChemicalsClass(
             # There is a list of starting compounds in the log file
-            StartingCompounds=ReadStartingCompounds(logFile),
+            StartingCompounds=ReadStartingCompounds(logFile, engine=engine),
             Mixtures=[],  # Mixtures get filled in later
             # Then we have the potential products from the synthesis.
             # Be as thorough as you like here, it will help you later on
@@ -148,22 +169,25 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
 
     logging.info("defining the Mixtures based on Mixtures of starting compounds")
 
+    # the starting compounds by ID, the first one if listed more than once:
+    reagentsByID, reagentOrder = {}, {}
+    for n, reagent in enumerate(exp.Chemicals.StartingCompounds):
+        reagentsByID.setdefault(reagent.ID, reagent)
+        reagentOrder.setdefault(reagent.ID, n)
+
     # make a mixture as defined in each of the excel sheets:
-    for filename in solFiles:
+    for solutionNumber, filename in enumerate(solFiles):
         assert filename.exists(), f"{filename=} does not exist"
+        # select the solution by its position if reading from an original RoWaN log
+        solutionSelection = dict(ExperimentID=experimentID, SampleNumber=f"Solution{solutionNumber}")
         # read the synthesis logs:
-        df = pd.read_excel(
-            filename,
-            sheet_name="Sheet1",
-            index_col=None,
-            header=0,
-            parse_dates=["Time"],
-        )
-        assert len(df.SampleNumber.unique()) == 1, logging.error(
+        rawLog, solutionExperiment, solutionId = readIdentifiedRawLog(filename, **solutionSelection, engine=engine)
+        assert solutionId is not None, logging.error(
             "no unique mixture ID (sampleNumber) identified in the solution log"
         )
-        solutionId = df.SampleNumber.unique()[0]
-        rawLog = readRawMessageLog(filename)
+        assert solutionExperiment is not None, logging.error(
+            f"The solution log '{filename}' holds more than one experiment, select one with experimentID"
+        )
         mix = Mixture(
             ID=solutionId,
             MixtureName="Mixture",
@@ -176,35 +200,37 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         aNumber = chempy.util.periodic.atomic_number("Zn")
         mixIsMetal = False
         mixIsLinker = False
-        # see known issue on the BAMResearch DACHS Git..
-        # this is to avoid false matches when using overlapping names:
-        ReagentIDsUsedInSynthesis = [i.Value for i in find_in_log(rawLog, "ReagentID", Highlander=False)]
-        # print(f"{ReagentIDsUsedInSynthesis=}")
-        for reagent in exp.Chemicals.StartingCompounds:
-            RLMList = find_in_log(rawLog, [reagent.ID, "mass of"], Highlander=False, raiseWarning=False)
-            if RLMList is not None:  # if the list is not empty:
-                for RLM in RLMList:  # add each to the mix
-                    # find the preceding message to ensure the reagentID is correct:
-                    previousRLM = [i for i in rawLog if i.Index == (RLM.Index - 1)]
-                    if not len(previousRLM):
-                        break  # previousRLM might be empty
-                    previousRLM = previousRLM[-1]
-                    logging.info(f"{reagent.ID=}, {previousRLM.Value=}, so: {reagent.ID == previousRLM.Value}")
-                    if reagent.ID in ReagentIDsUsedInSynthesis:
-                        # no idea why I can't also check for this match:
-                        # reagent.ID==previousRLM.Value, I get a problem later on
-                        mix.add_reagent_to_mix(reag=reagent, ReagentMass=RLM.Quantity)
-                        if aNumber in reagent.Chemical.Substance.composition.keys():
-                            mixIsMetal = True
-                        if "C4H6N2" in reagent.Chemical.Substance.name:
-                            mixIsLinker = True
+        # all messages needed from the solution log, found in a single pass:
+        solutionFound = find_many_in_log(
+            rawLog,
+            dict(
+                MixedTogether=LogQuery("mixed together", Which="first"),
+                DensityDetermined=LogQuery("density determined", Which="first", raiseWarning=False),
+                DensityCalculated=LogQuery("density calculated", Which="first", raiseWarning=False),
+            ),
+        )
+        # the masses of each reagent, by the exact ID given in the preceding ReagentID message,
+        # added in order of the StartingCompounds
+        reagentMasses = find_reagent_masses(rawLog)
+        for reagentID in sorted(reagentMasses, key=lambda ID: reagentOrder.get(ID, len(reagentOrder))):
+            if reagentID not in reagentsByID:
+                logging.warning(f"Reagent {reagentID} used in {solutionId} not found in the starting compounds.")
+                continue
+            reagent = reagentsByID[reagentID]
+            for RLM in reagentMasses[reagentID]:  # add each to the mix
+                logging.info(f"{reagent.ID=}, {RLM.Message=}")
+                mix.add_reagent_to_mix(reag=reagent, ReagentMass=RLM.Quantity)
+                if aNumber in reagent.Chemical.Substance.composition.keys():
+                    mixIsMetal = True
+                if "C4H6N2" in reagent.Chemical.Substance.name:
+                    mixIsLinker = True
 
         if mixIsMetal:
             mix.Description = "Metal salt dispersion"
         if mixIsLinker:
             mix.Description = "Organic linker dispersion"
 
-        RLM = find_in_log(rawLog, "mixed together", Highlander=True, Which="first")
+        RLM = solutionFound["MixedTogether"]
         if RLM is not None:  # if this is not empty
             mix.PreparationDate = RLM.TimeStamp
 
@@ -218,12 +244,12 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         )
 
         # enter measured density if available
-        RLM = find_in_log(rawLog, "density determined", Highlander=True, Which="first", raiseWarning=False)
+        RLM = solutionFound["DensityDetermined"]
         if RLM is not None:  # if this is not empty
             mix.Density = RLM.Quantity
         # override density if calculated is present, as measured was done at 20 degrees,
         # and calculated is at lab temp:
-        RLM = find_in_log(rawLog, "density calculated", Highlander=True, Which="first", raiseWarning=False)
+        RLM = solutionFound["DensityCalculated"]
         if RLM is not None:  # if this is not empty
             mix.Density = RLM.Quantity
         # fix the detailed description, clipping off the last ', and ':
@@ -232,37 +258,57 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
 
     logging.info("defining the synthesis log")
 
+    synthesisLog, synthesisExperiment, _ = readIdentifiedRawLog(
+        synFile, ExperimentID=experimentID, SampleNumber=sampleID, engine=engine
+    )
+    assert synthesisExperiment is not None or not len(synthesisLog), logging.error(
+        f"The synthesis log '{synFile}' holds more than one experiment, select one with experimentID"
+    )
     exp.Synthesis = SynthesisClass(
         ID="Synthesis",
         Name="MOF standard synthesis in MeOH, room temperature, nominally 20 minute residence time",
         # description gets added at the end with actual values...
-        RawLog=readRawMessageLog(synFile),
+        RawLog=synthesisLog,
     )
 
     # After our discussion, we've decided not to focus on including derived parameters just yet.
     # We still need a few things though.
     logging.info("Extracting the derived parameters")
+    # all messages needed from the synthesis log, found in a single pass:
+    found = find_many_in_log(
+        exp.Synthesis.RawLog,
+        dict(
+            StartRLM=LogQuery("Start injection of solution", Which="last"),
+            StopRLM=LogQuery("Sample placed in centrifuge", Which="first"),
+            SetupID=LogQuery("SetupID", Which="last", raiseWarning=False),
+            allVolumes=LogQuery(["Solution", "volume set"], Which="all"),
+            allSolutions=LogQuery(["Stop", "injection of solution"], Which="all"),
+            InitialMass=LogQuery(["empty Falcon tube"], ["+ dry sample", " lid"], Which="last"),
+            FinalMass=LogQuery(["of Falcon tube + dry sample"], ["lid"], Which="last"),
+            LabTemperature=LogQuery("Environmental temperature", Which="last"),
+            LabHumidity=LogQuery("Environmental humidity", Which="last"),
+            LabPressure=LogQuery("Environmental pressure", Which="last"),
+            WashSolventVolume=LogQuery("Wash volume", Which="last"),
+            WashSolvent=LogQuery("Wash solution", Which="last"),
+            Centrifugations=LogQuery("Sample placed in centrifuge", Which="all"),
+            InjectionSpeed=LogQuery(["Solution", "rate set"], Which="last"),
+            Notes=LogQuery("Note", Which="all", raiseWarning=False),
+            StirrerSpeed=LogQuery("Set stirring speed", Which="last"),
+            CentrifugeSpeed=LogQuery(["Sample", "placed in centrifuge"], Which="last"),
+            CentrifugeDuration=LogQuery(["Centrifuge", "set time"], Which="last"),
+            OvenStop=LogQuery(["Sample", "removed from oven"], Which="last"),
+            OvenStart=LogQuery(["Sample", "oven"], Which="first"),
+        ),
+    )
     # minimal derived information:
     # add the reaction Mixtures to Chemicals.Mixtures
     # for the start time we need the last "start injection of solution" timestamp
-    StartRLM = find_in_log(
-        exp.Synthesis.RawLog,
-        "Start injection of solution",
-        Highlander=True,
-        Which="last",
-        # return_indices=True,
-    )  # .astimezone('UTC'))#, does this need str-ing?
+    StartRLM = found["StartRLM"]
     ReactionStart = StartRLM.TimeStamp if StartRLM is not None else pd.to_datetime(0, utc=True)
 
     exp.ExperimentName = f"DACHS {rawLog[0].ExperimentID} series"
 
-    StopRLM = find_in_log(
-        exp.Synthesis.RawLog,
-        "Sample placed in centrifuge",
-        Highlander=True,
-        Which="first",
-        # return_indices=True,
-    )  # .astimezone('UTC'))#, does this need str-ing?
+    StopRLM = found["StopRLM"]
     ReactionStop = StopRLM.TimeStamp if StopRLM is not None else pd.to_datetime(0, utc=True)
 
     # more detailed logging style also indicating sources and descriptions
@@ -286,14 +332,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         sun = amset
 
     # override with info in log if present:
-    LogEntry = find_in_log(
-        exp.Synthesis.RawLog,
-        "SetupID",
-        Highlander=True,
-        Which="last",
-        raiseWarning=False,
-        # return_indices=True,
-    )
+    LogEntry = found["SetupID"]
     if LogEntry is not None:
         if "AMSET" in LogEntry.Value:
             sun = LogEntry.Value  # override if in the log
@@ -302,7 +341,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         raise SyntaxError
     logging.info(f"SetupName: {sun}")
     # At this point, we need the experimental setup as we need the falcon tube..
-    exp.ExperimentalSetup = readExperimentalSetup(filename=logFile, SetupName=sun)
+    exp.ExperimentalSetup = readExperimentalSetup(filename=logFile, SetupName=sun, engine=engine)
     AMSETDescription = exp.ExperimentalSetup.Description
     # print(exp.ExperimentalSetup)
     container = [
@@ -320,7 +359,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
     )
     # to this we need to find the volume and density of which solution for the injections
     # TODO: do something better to separate solution numbers and their respective volumes.
-    allVolumes = find_in_log(exp.Synthesis.RawLog, ["Solution", "volume set"], Highlander=False)
+    allVolumes = found["allVolumes"]
     if allVolumes is None:
         logging.error(f"No injection volume specified in {synFile.stem}")
 
@@ -331,7 +370,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
     Syringe = Syringe[-1]
     CalibrationFactor = Syringe.PVs["volume"].CalibrationFactor
     CalibrationOffset = Syringe.PVs["volume"].CalibrationOffset
-    allSolutions = find_in_log(exp.Synthesis.RawLog, ["Stop", "injection of solution"], Highlander=False)
+    allSolutions = found["allSolutions"]
     # I don't have the densities yet, so we have to assume something for now
     for solutionRLM in allSolutions:
         solutionId = solutionRLM.Value
@@ -349,7 +388,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         )  # default does not seem to work, still returns None.
         if DensityOfAdd is None:
             print(f"no density found for {solutionId}, assuming 0.792 g/cc")
-            DensityOfAdd = ureg.Quantity("0.792 g/cc")
+            DensityOfAdd = unitCache.parse("0.792 g/cc")
         # print(f"{DensityOfAdd=}")
         # print(
         #     f"adding mixture to mix: {exp.Chemicals.Mixtures[solutionId]=}, {VolumeRLM.Quantity=},
@@ -399,16 +438,8 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         )
     ]
     # calculate the weight of Product:
-    InitialMass = find_in_log(
-        exp.Synthesis.RawLog,
-        ["empty Falcon tube"],
-        excludeString=["+ dry sample", " lid"],
-        Highlander=True,
-        Which="last",
-    )
-    FinalMass = find_in_log(
-        exp.Synthesis.RawLog, ["of Falcon tube + dry sample"], excludeString=["lid"], Highlander=True, Which="last"
-    )
+    InitialMass = found["InitialMass"]
+    FinalMass = found["FinalMass"]
 
     # mLocs = np.where(dfMask)[0]
     logging.debug(f" {InitialMass=}, \n {FinalMass=}")
@@ -491,13 +522,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
     ]
 
     # store the room temperature:
-    LogEntry = find_in_log(
-        exp.Synthesis.RawLog,
-        "Environmental temperature",
-        Highlander=True,
-        Which="last",
-        # return_indices=True,
-    )
+    LogEntry = found["LabTemperature"]
     # exp.Synthesis.KeyParameters.update({"LabTemperature": LogEntry.Quantity})
     if LogEntry is not None:
         exp.Synthesis.DerivedParameters += [
@@ -509,13 +534,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
             )
         ]
     # store the room temperature:
-    LogEntry = find_in_log(
-        exp.Synthesis.RawLog,
-        "Environmental temperature",
-        Highlander=True,
-        Which="last",
-        # return_indices=True,
-    )
+    LogEntry = found["LabTemperature"]
     # exp.Synthesis.KeyParameters.update({"LabTemperature": LogEntry.Quantity})
     if LogEntry is not None:
         exp.Synthesis.DerivedParameters += [
@@ -527,13 +546,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
             )
         ]
     # store the room temperature:
-    LogEntry = find_in_log(
-        exp.Synthesis.RawLog,
-        "Environmental humidity",
-        Highlander=True,
-        Which="last",
-        # return_indices=True,
-    )
+    LogEntry = found["LabHumidity"]
     # exp.Synthesis.KeyParameters.update({"LabTemperature": LogEntry.Quantity})
     if LogEntry is not None:
         exp.Synthesis.DerivedParameters += [
@@ -545,13 +558,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
             )
         ]
     # store the room temperature:
-    LogEntry = find_in_log(
-        exp.Synthesis.RawLog,
-        "Environmental pressure",
-        Highlander=True,
-        Which="last",
-        # return_indices=True,
-    )
+    LogEntry = found["LabPressure"]
     # exp.Synthesis.KeyParameters.update({"LabTemperature": LogEntry.Quantity})
     if LogEntry is not None:
         exp.Synthesis.DerivedParameters += [
@@ -565,13 +572,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
 
     # New additions 2024-09-18
     # store the wash solvvent volume:
-    LogEntry = find_in_log(
-        exp.Synthesis.RawLog,
-        "Wash volume",
-        Highlander=True,
-        Which="last",
-        # return_indices=True,
-    )
+    LogEntry = found["WashSolventVolume"]
     # exp.Synthesis.KeyParameters.update({"LabTemperature": LogEntry.Quantity})
     if LogEntry is not None:
         exp.Synthesis.DerivedParameters += [
@@ -584,13 +585,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         ]
 
     # store the wash solvvent:
-    LogEntry = find_in_log(
-        exp.Synthesis.RawLog,
-        "Wash solution",
-        Highlander=True,
-        Which="last",
-        # return_indices=True,
-    )
+    LogEntry = found["WashSolvent"]
     # washSolventID = [i.Chemical.ChemicalName for i in exp.Chemicals.StartingCompounds if i.ID == LogEntry.Value]
     # if len(washSolventID) == 1:
     #     washSolventID = washSolventID[0]
@@ -608,12 +603,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         ]
 
     # store the number of washes by counting the number of centrifugations -1
-    LogEntry = find_in_log(
-        exp.Synthesis.RawLog,
-        "Sample placed in centrifuge",
-        Highlander=False,
-        # return_indices=True,
-    )
+    LogEntry = found["Centrifugations"]
     if LogEntry is not None:
         exp.Synthesis.DerivedParameters += [
             DerivedParameter(
@@ -627,13 +617,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
         ]
 
     # injection speed:
-    LogEntry = find_in_log(
-        exp.Synthesis.RawLog,
-        ["Solution", "rate set"],
-        Highlander=True,
-        Which="last",
-        # return_indices=True,
-    )
+    LogEntry = found["InjectionSpeed"]
     # exp.Synthesis.KeyParameters.update({"InjectionSpeed": LogEntry.Quantity})
     if LogEntry is not None:
         exp.Synthesis.DerivedParameters += [
@@ -658,14 +642,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
     ]
     # add notes to the KeyParameters:
     noteCounter = 0
-    noteList = find_in_log(
-        exp.Synthesis.RawLog,
-        "Note",
-        Highlander=False,
-        # Which="last",
-        # return_indices=True,
-        raiseWarning=False,
-    )
+    noteList = found["Notes"]
     if noteList is not None:
         for note in noteList:
             exp.Synthesis.DerivedParameters += [
@@ -685,13 +662,7 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
     # TODO: specify the order and delay between the solution injections
 
     # stirring speed RPM
-    StirrerSpeed = find_in_log(
-        exp.Synthesis.RawLog,
-        "Set stirring speed",
-        Highlander=True,
-        Which="last",
-        # return_indices=True,
-    )
+    StirrerSpeed = found["StirrerSpeed"]
     if StirrerSpeed is not None:
         exp.Synthesis.DerivedParameters += [
             DParFromLogEntry(
@@ -702,41 +673,21 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
             )
         ]
 
-    CentrifugeSpeed = find_in_log(
-        exp.Synthesis.RawLog,
-        ["Sample", "placed in centrifuge"],
-        Highlander=True,
-        Which="last",
-    )
+    CentrifugeSpeed = found["CentrifugeSpeed"]
     if CentrifugeSpeed is not None:
         exp.Synthesis.DerivedParameters += [
             DParFromLogEntry("CentrifugeSpeed", "Centrifuge Speed", "The speed of centrifugation", CentrifugeSpeed)
         ]
 
-    CentrifugeDuration = find_in_log(
-        exp.Synthesis.RawLog,
-        ["Centrifuge", "set time"],
-        Highlander=True,
-        Which="last",
-    )
+    CentrifugeDuration = found["CentrifugeDuration"]
     if CentrifugeDuration is not None:
         exp.Synthesis.DerivedParameters += [
             DParFromLogEntry(
                 "CentrifugeDuration", "Centrifuge Duration", "The duration of centrifugation", CentrifugeDuration
             )
         ]
-    OvenStop = find_in_log(
-        exp.Synthesis.RawLog,
-        ["Sample", "removed from oven"],
-        Highlander=True,
-        Which="last",
-    )
-    OvenStart = find_in_log(
-        exp.Synthesis.RawLog,
-        ["Sample", "oven"],
-        Highlander=True,
-        Which="first",
-    )
+    OvenStop = found["OvenStop"]
+    OvenStart = found["OvenStart"]
     if OvenStart is not None:
         exp.Synthesis.DerivedParameters += [
             DParFromLogEntry(
@@ -826,20 +777,20 @@ def create(logFile: Path, solFiles: List[Path], synFile: Path, amset: str = None
 
     # defaults for text generation:
     DPars = {
-        "ReactionTime": ureg.Quantity(-1.0, "s"),
-        "MetalSolutionAge": ureg.Quantity(-1.0, "s"),
-        "LinkerSolutionAge": ureg.Quantity(-1.0, "s"),
-        "MetalToLinkerRatio": ureg.Quantity(-1.0, "dimensionless"),
-        "MetalToMethanolRatio": ureg.Quantity(-1.0, "dimensionless"),
-        "SynthesisYieldLinker": ureg.Quantity(-1.0, "dimensionless"),
-        "LabTemperature": ureg.Quantity(-1.0, "degC"),
-        "InjectionSpeed": ureg.Quantity(-1.0, "ml/min"),
-        "SynthesisYield": ureg.Quantity(-1.0, "dimensionless"),
-        "CentrifugeSpeed": ureg.Quantity(-1.0, "rpm"),
-        "CentrifugeDuration": ureg.Quantity(-1.0, "s"),
-        "OvenTemperature": ureg.Quantity(-1.0, "degC"),
-        "ForcedDryingDuration": ureg.Quantity(-1.0, "s"),
-        "StirrerSpeed": ureg.Quantity(-1.0, "rpm"),
+        "ReactionTime": unitCache.quantity(-1.0, "s"),
+        "MetalSolutionAge": unitCache.quantity(-1.0, "s"),
+        "LinkerSolutionAge": unitCache.quantity(-1.0, "s"),
+        "MetalToLinkerRatio": unitCache.quantity(-1.0, "dimensionless"),
+        "MetalToMethanolRatio": unitCache.quantity(-1.0, "dimensionless"),
+        "SynthesisYieldLinker": unitCache.quantity(-1.0, "dimensionless"),
+        "LabTemperature": unitCache.quantity(-1.0, "degC"),
+        "InjectionSpeed": unitCache.quantity(-1.0, "ml/min"),
+        "SynthesisYield": unitCache.quantity(-1.0, "dimensionless"),
+        "CentrifugeSpeed": unitCache.quantity(-1.0, "rpm"),
+        "CentrifugeDuration": unitCache.quantity(-1.0, "s"),
+        "OvenTemperature": unitCache.quantity(-1.0, "degC"),
+        "ForcedDryingDuration": unitCache.quantity(-1.0, "s"),
+        "StirrerSpeed": unitCache.quantity(-1.0, "rpm"),
         # "StirrerBarModel": "Unknown",
         "AMSETDescription": AMSETDescription,
         "OrderDescription": "Unknown injection order",
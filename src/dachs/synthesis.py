@@ -11,26 +11,44 @@ __license__ = "GPLv3+"
 __date__ = "2022/11/07"
 __status__ = "beta"
 
-from typing import List, Optional, Union
+import re
+import sys
+from collections.abc import Iterable
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import chempy
+import numpy as np
+import pandas as pd
 import pint
 import yaml
-from attrs import Factory, converters, define, field, validators
+from attrs import Factory, converters, define, field, fields, validators
 from pandas import Timestamp
 
 from dachs import ureg  # get importError when using: "from . import ureg"
 from dachs.additemstoattrs import addItemsToAttrs
 from dachs.equipment import PV
-from dachs.helpers import whitespaceCleanup
+from dachs.helpers import internStr, whitespaceCleanup
+from dachs.logsearch import LogIndex
+from dachs.units import normalizeUnit, unitCache
 
 NoneType = type(None)
 
 
+# plain decimal numbers, converted directly, other strings are interpreted by YAML
+intPattern = re.compile(r"[-+]?(0|[1-9][0-9]*)")
+floatPattern = re.compile(r"[-+]?[0-9]+\.[0-9]+")
+
+
 def ValConverter(Val):
     """Checks if Val is a string, and if so, converts it to a float or int if possible"""
     if str(Val).strip() != "-":
-        return yaml.safe_load(Val) if isinstance(Val, str) else Val
+        if not isinstance(Val, str):
+            return Val
+        if intPattern.fullmatch(Val):
+            return int(Val)
+        if floatPattern.fullmatch(Val):
+            return float(Val)
+        return yaml.safe_load(Val)
     else:
         return None
 
@@ -40,12 +58,7 @@ def UnitConverter(UnitStr: Union[str, None]) -> Union[str, None]:
     if UnitStr is None:
         return None
     if str(UnitStr).strip() != "-":
-        UnitStr = str(UnitStr)
-        U = UnitStr.strip()
-        U = "percent" if U == "%" else U
-        U = "degC" if U == "C" else U
-        U = "minute" if U == "mins" else U
-        return U
+        return sys.intern(normalizeUnit(UnitStr))
     else:
         return None
 
@@ -63,7 +76,7 @@ def ConvertToQuantity(Val, Unit):
             condition += 1
     if condition == 2:  # both value and unit are present
         try:
-            Quantity = ureg.Quantity(float(Val), str(Unit))
+            Quantity = unitCache.quantity(float(Val), str(Unit))
         except pint.PintError:  # conversion fail
             Quantity = None
     return Quantity
@@ -75,10 +88,10 @@ class RawLogMessage(addItemsToAttrs):
 
     Index: int = field(default=0, validator=validators.instance_of(int))
     TimeStamp: Timestamp = field(default=None, validator=validators.instance_of(Timestamp))
-    MessageLevel: str = field(default="", validator=validators.instance_of(str), converter=str)
-    ExperimentID: str = field(default="", validator=validators.instance_of(str), converter=str)
-    SampleID: str = field(default="", validator=validators.instance_of(str), converter=str)
-    Message: str = field(default="", validator=validators.instance_of(str), converter=str)
+    MessageLevel: str = field(default="", validator=validators.instance_of(str), converter=internStr)
+    ExperimentID: str = field(default="", validator=validators.instance_of(str), converter=internStr)
+    SampleID: str = field(default="", validator=validators.instance_of(str), converter=internStr)
+    Message: str = field(default="", validator=validators.instance_of(str), converter=internStr)
     Quantity: Optional[ureg.Quantity] = field(
         default=None,
         validator=validators.optional(validators.instance_of(ureg.Quantity)),
@@ -103,6 +116,406 @@ class RawLogMessage(addItemsToAttrs):
         self.Quantity = ConvertToQuantity(self.Value, self.Unit)
 
 
+class RawLogRow:
+    """
+    Lightweight view on a single row of a RawLogTable. It offers the same attributes (and dict-like access) as
+    a RawLogMessage, but reads them from the columns of the table on demand.
+    """
+
+    __slots__ = ("_table", "_pos")
+    # same keys as stored for a RawLogMessage:
+    _storeKeys = [i.name for i in fields(RawLogMessage) if not i.name.startswith("_")]
+
+    def __init__(self, table: "RawLogTable", pos: int):
+        self._table = table
+        self._pos = pos
+
+    @property
+    def Index(self) -> int:
+        return int(self._table.value("Index", self._pos))
+
+    @property
+    def TimeStamp(self) -> Timestamp:
+        return self._table.value("TimeStamp", self._pos)
+
+    @property
+    def MessageLevel(self) -> str:
+        return self._table.value("MessageLevel", self._pos)
+
+    @property
+    def ExperimentID(self) -> str:
+        return self._table.value("ExperimentID", self._pos)
+
+    @property
+    def SampleID(self) -> str:
+        return self._table.value("SampleID", self._pos)
+
+    @property
+    def Message(self) -> str:
+        return self._table.value("Message", self._pos)
+
+    @property
+    def Value(self) -> Optional[Union[float, int, str]]:
+        return self._table.value("Value", self._pos)
+
+    @property
+    def Unit(self) -> Optional[str]:
+        return self._table.value("Unit", self._pos)
+
+    @property
+    def Using(self) -> Optional[str]:
+        return self._table.value("Using", self._pos)
+
+    @property
+    def Quantity(self) -> Optional[ureg.Quantity]:
+        return ConvertToQuantity(self.Value, self.Unit)
+
+    def keys(self) -> Iterable:
+        return iter(self._storeKeys)
+
+    def items(self) -> Iterable:
+        for key in self._storeKeys:
+            yield key, getattr(self, key)
+
+    def __getitem__(self, k: str) -> Any:
+        if k not in self._storeKeys:
+            raise KeyError(k)
+        return getattr(self, k)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RawLogRow):
+            return (self._table is other._table) and (self._pos == other._pos)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._table), self._pos))
+
+    def __repr__(self) -> str:
+        return f"RawLogRow({', '.join(f'{key}={val!r}' for key, val in self.items())})"
+
+    def previous(self) -> Optional["RawLogRow"]:
+        """The row before this one in the table, None for the first row"""
+        return RawLogRow(self._table, self._pos - 1) if self._pos > 0 else None
+
+    def next(self) -> Optional["RawLogRow"]:
+        """The row after this one in the table, None for the last row"""
+        return RawLogRow(self._table, self._pos + 1) if self._pos + 1 < len(self._table) else None
+
+    def previousMatch(
+        self, searchString: Union[str, List[str]], excludeString: Union[str, List[str], None] = None
+    ) -> Optional["RawLogRow"]:
+        """The closest row before this one with a message matching the given terms, see RawLogTable"""
+        return self._table.previousMatch(self._pos, searchString, excludeString)
+
+    def asRawLogMessage(self) -> RawLogMessage:
+        """Materializes this row as a full RawLogMessage instance"""
+        return RawLogMessage(**{key: getattr(self, key) for key in self._storeKeys if key != "Quantity"})
+
+
+class LogReadouts(NamedTuple):
+    """The numeric readouts in one unit from a raw log, in log order"""
+
+    Quantity: pint.Quantity  # the values as a single array Quantity
+    Index: np.ndarray  # the RawLogMessage.Index of each value
+    TimeStamp: pd.DatetimeIndex
+
+
+class RawLogTable:
+    """
+    Columnar storage of the raw log messages from the RoWaN synthesis platform.
+    Instead of one RawLogMessage object per log line, the fields are kept as NumPy/pandas columns,
+    the same converters as for RawLogMessage are applied once to each column. The text columns repeat a few
+    distinct strings, they are stored as codes into a list of their (interned) distinct values.
+    Iterating over or indexing the table returns RawLogRow views, created on demand only.
+    """
+
+    columnNames = (
+        "Index",
+        "TimeStamp",
+        "MessageLevel",
+        "ExperimentID",
+        "SampleID",
+        "Message",
+        "Value",
+        "Unit",
+        "Using",
+    )
+    # the columns stored as codes into a list of categories
+    categoricalColumns = ("MessageLevel", "ExperimentID", "SampleID", "Message", "Unit", "Using")
+
+    def __init__(
+        self,
+        Index: Iterable[int] = None,
+        TimeStamp: Iterable[Timestamp] = None,
+        MessageLevel: Iterable[str] = None,
+        ExperimentID: Iterable[str] = None,
+        SampleID: Iterable[str] = None,
+        Message: Iterable[str] = None,
+        Value: Iterable = None,
+        Unit: Iterable[Optional[str]] = None,
+        Using: Iterable[Optional[str]] = None,
+    ):
+        Message = _objectColumn(Message if Message is not None else [])
+        length = len(Message)
+        if TimeStamp is None:
+            TimeStamp = [pd.NaT] * length
+
+        def optionalColumn(col, default):
+            return _objectColumn(col) if col is not None else np.full(length, default, dtype=object)
+
+        columns = dict(
+            Index=np.asarray(Index if Index is not None else np.arange(length), dtype=np.int64),
+            TimeStamp=pd.DatetimeIndex(pd.to_datetime(TimeStamp, utc=True)),
+            MessageLevel=_strColumn(optionalColumn(MessageLevel, "")),
+            ExperimentID=_strColumn(optionalColumn(ExperimentID, "")),
+            SampleID=_strColumn(optionalColumn(SampleID, "")),
+            Message=_strColumn(Message),
+            Value=_mapStrings(optionalColumn(Value, None), ValConverter),
+            Unit=_mapStrings(_strOrNone(optionalColumn(Unit, None)), UnitConverter),
+            Using=_mapColumn(optionalColumn(Using, None), lambda val: None if pd.isnull(val) else str(val)),
+        )
+        for name, col in columns.items():
+            assert len(col) == length, f"Column {name} has {len(col)} entries, expected {length}"
+        self._length = length
+        # the distinct values of each categorical column and their codes
+        self._categories: Dict[str, List[Optional[str]]] = {name: [] for name in self.categoricalColumns}
+        self._categoryCodes: Dict[str, Dict[Optional[str], int]] = {name: {} for name in self.categoricalColumns}
+        self._categoryArrays: Dict[str, np.ndarray] = {}  # the categories as arrays for indexing, on demand
+        # the columns with spare capacity for appending, the time stamps as UTC datetime64 values
+        self._buffers = {name: col for name, col in columns.items() if name != "TimeStamp"}
+        self._buffers["TimeStamp"] = _utcValues(columns["TimeStamp"])
+        for name in self.categoricalColumns:
+            self._buffers[name] = self._encode(name, columns[name])
+        self._timeStamps = columns["TimeStamp"]  # the DatetimeIndex of the current rows, rebuilt on demand
+        self._logIndex = None  # the search index of the messages, built on demand
+        self._positions = None  # RawLogMessage.Index -> row position, built on demand
+
+    @classmethod
+    def fromMessages(cls, messages: Iterable[RawLogMessage]) -> "RawLogTable":
+        """Creates a table from a list of RawLogMessage (or RawLogRow) instances"""
+        messages = list(messages)
+        return cls(**{name: [getattr(msg, name) for msg in messages] for name in cls.columnNames})
+
+    def _codeOf(self, name: str, value: Optional[str]) -> int:
+        # the code of *value* in the categories of column *name*, added if it is new
+        code = self._categoryCodes[name].get(value)
+        if code is None:
+            code = len(self._categories[name])
+            self._categories[name] += [sys.intern(value) if isinstance(value, str) else value]
+            self._categoryCodes[name][value] = code
+            self._categoryArrays.pop(name, None)
+        return code
+
+    def _encode(self, name: str, values: np.ndarray) -> np.ndarray:
+        # the codes of *values* (str or None) in the categories of column *name*
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        lookup = np.array(
+            [self._codeOf(name, val if isinstance(val, str) else None) for val in uniques], dtype=np.int32
+        )
+        return lookup[codes] if len(values) else np.empty(0, dtype=np.int32)
+
+    def categorical(self, name: str) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """The codes and the categories (distinct values) of the categorical column *name*"""
+        return self._buffers[name][: self._length], list(self._categories[name])
+
+    def column(self, name: str) -> Union[np.ndarray, pd.DatetimeIndex]:
+        """Returns the column *name*, one of RawLogTable.columnNames"""
+        if name == "TimeStamp":
+            if self._timeStamps is None:
+                self._timeStamps = pd.DatetimeIndex(self._buffers["TimeStamp"][: self._length]).tz_localize("UTC")
+            return self._timeStamps
+        if name in self._categories:
+            if name not in self._categoryArrays:
+                categories = np.empty(len(self._categories[name]), dtype=object)
+                categories[:] = self._categories[name]
+                self._categoryArrays[name] = categories
+            return self._categoryArrays[name][self._buffers[name][: self._length]]
+        return self._buffers[name][: self._length]
+
+    def value(self, name: str, pos: int) -> Any:
+        """The entry of column *name* in row *pos*, without building the column"""
+        if name == "TimeStamp":
+            return self.column(name)[pos]
+        if name in self._categories:
+            return self._categories[name][self._buffers[name][pos]]
+        return self._buffers[name][pos]
+
+    def extend(self, other: "RawLogTable") -> None:
+        """
+        Appends the rows of another table in place, rows obtained before remain valid.
+        The columns grow geometrically, so the cost of appending is proportional to the rows appended.
+        """
+        newLength = self._length + len(other)
+        if newLength > len(self._buffers["Index"]):  # out of capacity
+            capacity = max(newLength, 2 * len(self._buffers["Index"]), 16)
+            for name, buf in self._buffers.items():
+                grown = np.empty(capacity, dtype=buf.dtype)
+                grown[: self._length] = buf[: self._length]
+                self._buffers[name] = grown
+        for name, buf in self._buffers.items():
+            if name == "TimeStamp":
+                values = _utcValues(other.column(name))
+            elif name in self._categories:  # translated to the codes of this table
+                otherCodes, otherCategories = other.categorical(name)
+                lookup = np.array([self._codeOf(name, val) for val in otherCategories], dtype=np.int32)
+                values = lookup[otherCodes] if len(otherCodes) else otherCodes
+            else:
+                values = other.column(name)
+            buf[self._length : newLength] = values
+        self._length = newLength
+        self._timeStamps = None
+        self._logIndex = None
+        self._positions = None
+
+    def logIndex(self) -> LogIndex:
+        """The search index over the messages, built on first use"""
+        if self._logIndex is None:
+            self._logIndex = LogIndex(self.column("Message"))
+        return self._logIndex
+
+    def position(self, index: int) -> Optional[int]:
+        """The row position of the message with the given RawLogMessage.Index, None if there is none"""
+        if self._positions is None:
+            self._positions = {int(idx): pos for pos, idx in enumerate(self.column("Index"))}
+        return self._positions.get(int(index))
+
+    def byIndex(self, index: int) -> Optional[RawLogRow]:
+        """The row of the message with the given RawLogMessage.Index, None if there is none"""
+        pos = self.position(index)
+        return RawLogRow(self, pos) if pos is not None else None
+
+    def previousMatch(
+        self, pos: int, searchString: Union[str, List[str]], excludeString: Union[str, List[str], None] = None
+    ) -> Optional[RawLogRow]:
+        """
+        The closest row before position *pos* with a message containing all *searchString* and none of the
+        *excludeString* terms (as in find_in_log), None if there is none.
+        """
+        pos = self.logIndex().precedingMatches(searchString, excludeString)[pos]
+        return RawLogRow(self, int(pos)) if pos >= 0 else None
+
+    def readouts(
+        self,
+        searchString: Union[str, List[str], None] = None,
+        excludeString: Union[str, List[str], None] = None,
+    ) -> Dict[str, LogReadouts]:
+        """
+        The numeric readouts of the messages containing all *searchString* and none of the *excludeString*
+        terms (all messages if *searchString* is None), grouped by their unit. Each group holds the values as
+        one array Quantity with their indices and time stamps. A row is included if its RawLogRow.Quantity is
+        not None, unit strings resolving to the same pint Unit are grouped together.
+        """
+        positions = self.logIndex().matches([] if searchString is None else searchString, excludeString)
+        values, units = self.column("Value")[positions], self.column("Unit")[positions]
+        hasValue = np.fromiter((isinstance(val, (int, float)) for val in values), dtype=bool, count=len(values))
+        hasUnit = np.fromiter((unit not in (None, "", "-") for unit in units), dtype=bool, count=len(units))
+        positions, values, units = (
+            positions[hasValue & hasUnit],
+            values[hasValue & hasUnit],
+            units[hasValue & hasUnit],
+        )
+        codes, uniques = pd.factorize(np.array([str(unit) for unit in units], dtype=object))
+        groups: Dict[str, List[int]] = {}  # unit name -> codes of the unit strings resolving to it
+        for code, unitStr in enumerate(uniques):
+            try:
+                groups.setdefault(str(unitCache.unit(unitStr)), []).append(code)
+            except pint.PintError:  # not a unit, same as ConvertToQuantity
+                continue
+        readouts = {}
+        for name, groupCodes in groups.items():
+            selected = np.isin(codes, groupCodes)
+            readouts[name] = LogReadouts(
+                Quantity=ureg.Quantity(values[selected].astype(float), unitCache.unit(uniques[groupCodes[0]])),
+                Index=self.column("Index")[positions[selected]],
+                TimeStamp=self.column("TimeStamp")[positions[selected]],
+            )
+        return readouts
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterable[RawLogRow]:
+        for pos in range(len(self)):
+            yield RawLogRow(self, pos)
+
+    def __getitem__(self, pos: Union[int, slice]) -> Union[RawLogRow, List[RawLogRow]]:
+        if isinstance(pos, slice):
+            return [RawLogRow(self, i) for i in range(len(self))[pos]]
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError(f"RawLogTable index {pos} out of range")
+        return RawLogRow(self, pos)
+
+    def __repr__(self) -> str:
+        return f"RawLogTable({len(self)} messages)"
+
+    def asRawLogMessages(self) -> List[RawLogMessage]:
+        """Materializes all rows as a list of RawLogMessage instances"""
+        # the columns have been converted on creation of the table, they only need to be checked once
+        columns = {name: list(self.column(name)) for name in self.columnNames}
+        columns["Index"] = [int(index) for index in columns["Index"]]
+        return RawLogMessage.fromColumns(**columns)
+
+
+def _utcValues(timeStamps: pd.DatetimeIndex) -> np.ndarray:
+    # UTC time stamps as datetime64 values of a fixed resolution, so they can be appended to each other
+    return timeStamps.tz_convert("UTC").tz_localize(None).to_numpy(dtype="datetime64[ns]")
+
+
+def _objectColumn(values) -> np.ndarray:
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values.to_numpy(dtype=object)
+    return np.asarray(list(values), dtype=object)
+
+
+def _strColumn(values: np.ndarray) -> np.ndarray:
+    if pd.api.types.infer_dtype(values, skipna=False) in ("string", "empty"):
+        return values.copy()
+    return np.array([str(val) for val in values], dtype=object)
+
+
+def _isString(values: np.ndarray) -> Optional[np.ndarray]:
+    # mask of the str entries, None if there are none
+    kind = pd.api.types.infer_dtype(values, skipna=False)
+    if kind == "string":
+        return np.ones(len(values), dtype=bool)
+    if kind in ("mixed", "mixed-integer"):
+        return np.fromiter((isinstance(val, str) for val in values), dtype=bool, count=len(values))
+    return None
+
+
+def _strOrNone(values: np.ndarray) -> np.ndarray:
+    # entries other than None as str, same as UnitConverter does for each
+    isString = _isString(values)
+    convert = ~isString if isString is not None else np.ones(len(values), dtype=bool)
+    convert &= values != None  # noqa: E711, elementwise
+    out = values.copy()
+    out[convert] = values[convert].astype(str)
+    return out
+
+
+def _mapStrings(values: np.ndarray, converter) -> np.ndarray:
+    # applies converter once to each distinct str, None is kept as is, same as converters.optional(converter)
+    # for converters which return anything else than a str unchanged
+    out = values.copy()
+    isString = _isString(values)
+    if isString is not None and isString.any():
+        codes, uniques = pd.factorize(values[isString])
+        converted = np.empty(len(uniques), dtype=object)
+        for i, val in enumerate(uniques):
+            converted[i] = converter(val)
+        out[isString] = converted[codes]
+    return out
+
+
+def _mapColumn(values: np.ndarray, converter) -> np.ndarray:
+    # same as converters.optional(converter) for each element
+    out = np.empty(len(values), dtype=object)
+    out[:] = [None if val is None else converter(val) for val in values]
+    return out
+
+
 @define
 class DerivedParameter(addItemsToAttrs):
     """
@@ -221,9 +634,9 @@ class SynthesisClass(addItemsToAttrs):
     ChemicalReaction: Optional[chempy.Reaction] = field(
         default=None, validator=validators.optional(validators.instance_of(chempy.Reaction))
     )
-    RawLog: Optional[List[RawLogMessage]] = field(
+    RawLog: Optional[Union[RawLogTable, List[RawLogMessage]]] = field(
         default=None,
-        validator=validators.optional(validators.instance_of(list)),
+        validator=validators.optional(validators.instance_of((RawLogTable, list))),
     )
     SynthesisLog: Optional[List[synthesisStep]] = field(
         default=None,
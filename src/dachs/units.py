@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Caches the units and quantities parsed by pint. A log holds only a few dozen distinct unit strings,
+so each is resolved once and the resulting Unit is reused for all Quantities created with it.
+"""
+
+__author__ = "Brian R. Pauw"
+__contact__ = "brian@stack.nl"
+__license__ = "GPLv3+"
+__date__ = "2026/10/18"
+__status__ = "beta"
+
+import threading
+from typing import Any, Dict, Tuple, Type, Union
+
+import pint
+
+from dachs import ureg
+
+# unit names used in the logs which are not understood by pint, and their replacement
+unitAliases = {"%": "percent", "C": "degC", "mins": "minute"}
+
+
+def normalizeUnit(unitStr: str) -> str:
+    """The unit string as understood by pint, with surrounding whitespace removed and aliases replaced"""
+    unitStr = str(unitStr).strip()
+    return unitAliases.get(unitStr, unitStr)
+
+
+class UnitCache:
+    """
+    Resolves unit strings to pint Units, and strings such as "0.792 g/cc" to Quantities, once for each string.
+    Unit strings not understood by pint are remembered as well, the same error is raised again on each use.
+    """
+
+    def __init__(self, registry: pint.UnitRegistry = ureg):
+        self.registry = registry
+        # the Unit of each string, or the class and arguments of the error raised for it
+        self._units: Dict[str, Union[pint.Unit, Tuple[Type[pint.PintError], tuple]]] = {}
+        self._quantities: Dict[str, Tuple[Any, pint.Unit]] = {}
+        self._factors: Dict[Tuple[pint.Unit, pint.Unit], float] = {}
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._units.clear()
+            self._quantities.clear()
+            self._factors.clear()
+
+    def unit(self, unitStr: Union[str, pint.Unit]) -> pint.Unit:
+        """The pint Unit for *unitStr*, raises a pint.PintError if it is not understood"""
+        if isinstance(unitStr, pint.Unit):
+            return unitStr
+        unit = self._units.get(unitStr)
+        if unit is None:
+            try:
+                unit = self.registry.Unit(normalizeUnit(unitStr))
+            except pint.PintError as e:  # not a unit, remembered as such
+                unit = (type(e), e.args)
+            with self._lock:
+                self._units[unitStr] = unit
+        if isinstance(unit, tuple):  # a new error each time, not growing the traceback of a shared one
+            errorType, args = unit
+            raise errorType(*args)
+        return unit
+
+    def isUnit(self, unitStr: str) -> bool:
+        """Tells if *unitStr* is understood by pint"""
+        try:
+            self.unit(unitStr)
+        except pint.PintError:
+            return False
+        return True
+
+    def quantity(self, value: Any, unitStr: Union[str, pint.Unit]) -> pint.Quantity:
+        """A new Quantity of *value* in the unit *unitStr*"""
+        return self.registry.Quantity(value, self.unit(unitStr))
+
+    def convert(self, quantity: pint.Quantity, unitStr: Union[str, pint.Unit]) -> pint.Quantity:
+        """
+        *quantity* in the unit *unitStr*, same as quantity.to(unitStr). The conversion factor between two units
+        is computed once, so converting prices between currencies and price units is a multiplication.
+        """
+        unit = self.unit(unitStr)
+        if not quantity._is_multiplicative:  # offset units such as degC
+            return quantity.to(unit)
+        key = (quantity.units, unit)
+        factor = self._factors.get(key)
+        if factor is None:
+            factor = self.registry.Quantity(1.0, quantity.units).m_as(unit)
+            with self._lock:
+                self._factors[key] = factor
+        return self.registry.Quantity(quantity.magnitude * factor, unit)
+
+    def parse(self, text: str) -> pint.Quantity:
+        """A new Quantity parsed from a string with value and unit, like ureg.Quantity(text)"""
+        parsed = self._quantities.get(text)
+        if parsed is None:
+            q = self.registry.Quantity(text)
+            parsed = (q.magnitude, q.units)
+            with self._lock:
+                self._quantities[text] = parsed
+        return self.registry.Quantity(*parsed)
+
+
+# the process-wide instance used for creating Quantities
+unitCache = UnitCache()
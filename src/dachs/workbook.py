@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Reads Excel workbooks with a selectable engine. All readers of DACHS go through *readWorkbook*.
+The compiled calamine engine is considerably faster than openpyxl; it is used when installed
+(package python-calamine), falling back to openpyxl otherwise.
+"""
+
+__author__ = "Brian R. Pauw"
+__contact__ = "brian@stack.nl"
+__license__ = "GPLv3+"
+__date__ = "2026/10/18"
+__status__ = "beta"
+
+import importlib.util
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+# the engine names accepted, 'auto' uses calamine if it is installed
+excelEngines = ("auto", "openpyxl", "calamine")
+# the modules required by each engine
+engineModules = {"openpyxl": "openpyxl", "calamine": "python_calamine"}
+
+
+def engineAvailable(engine: str) -> bool:
+    return importlib.util.find_spec(engineModules[engine]) is not None
+
+
+def excelEngine(engine: Optional[str] = None) -> str:
+    """
+    Resolves the engine to use for reading workbooks: *engine* if given, the environment variable
+    DACHS_EXCEL_ENGINE otherwise, or 'auto'. Falls back to openpyxl if the requested engine is not installed.
+    """
+    engine = (engine or os.environ.get("DACHS_EXCEL_ENGINE", "") or "auto").lower()
+    if engine not in excelEngines:
+        raise ValueError(f"Unknown excel engine {engine=}, choose from {excelEngines}")
+    if engine == "auto":
+        return "calamine" if engineAvailable("calamine") else "openpyxl"
+    if not engineAvailable(engine):
+        logging.warning(f"Excel engine '{engine}' is not installed, using openpyxl instead.")
+        return "openpyxl"
+    return engine
+
+
+def readWorkbook(filename: Path, sheet_name=0, engine: Optional[str] = None, **kwargs):
+    """
+    Reads one or more sheets of a workbook like pandas.read_excel(), using the engine resolved by
+    *excelEngine*. If a faster engine fails on the file, it is read again with openpyxl.
+    """
+    import pandas as pd
+
+    engine = excelEngine(engine)
+    try:
+        return pd.read_excel(filename, sheet_name=sheet_name, engine=engine, **kwargs)
+    except Exception as e:
+        if engine == "openpyxl":
+            raise
+        logging.warning(f"Reading '{filename}' with the {engine} engine failed ({e}), using openpyxl instead.")
+        return pd.read_excel(filename, sheet_name=sheet_name, engine="openpyxl", **kwargs)
@@ -1,16 +1,76 @@
 import logging
+import os
+import subprocess
 import sys
-from pathlib import Path
+import traceback
+from pathlib import Path, PurePosixPath
 
+import h5py
 import pandas as pd
 import pytest
+from mcsas3.mc_hdf import storeKVPairs
 
+import dachs
 from dachs import ureg
 from dachs.equipment import PV, Equipment
+from dachs.formulas import FormulaCache
+from dachs.hdf5 import writeKV
+from dachs.logbook import LogbookCache
+from dachs.logsearch import LogIndex, LogQuery
+from dachs.main import main
 from dachs.metaclasses import Experiment, ExperimentalSetupClass
-from dachs.readers import ReadStartingCompounds, readRawMessageLog
+from dachs.readers import (
+    RawLogFollower,
+    ReadStartingCompounds,
+    find_in_log,
+    find_many_in_log,
+    find_reagent_masses,
+    readEquipment,
+    readIdentifiedRawLog,
+    readRawMessageLog,
+    readRoWaNLog,
+)
 from dachs.reagent import Chemical, Mixture, Product, Reagent
-from dachs.synthesis import RawLogMessage
+from dachs.serialization import KVGraph, dumpKV, iterKV, rawLogLayout
+from dachs.splitlogs import splitLog
+from dachs.structure import create
+from dachs.synthesis import (
+    ConvertToQuantity,
+    RawLogMessage,
+    RawLogRow,
+    RawLogTable,
+    UnitConverter,
+    ValConverter,
+)
+from dachs.units import UnitCache
+from dachs.workbook import engineAvailable, excelEngine, readWorkbook
+
+
+def test_unitRegistry(tmp_path, monkeypatch) -> None:
+    assert ureg is dachs.getRegistry()
+    monkeypatch.setenv("DACHS_PINT_CACHE", "none")
+    assert dachs.registryCacheFolder() is None
+    monkeypatch.setenv("DACHS_PINT_CACHE", str(tmp_path))
+    cacheFolder = dachs.registryCacheFolder()
+    assert cacheFolder.parent == tmp_path / "pint"
+    for _ in range(2):  # builds the cache, then reads the definitions from it
+        registry = dachs.makeRegistry(cacheFolder)
+        assert len(list(cacheFolder.glob("*.pickle")))
+        assert registry.Quantity(2, "EUR").to("USD").magnitude == pytest.approx(2.18)
+        assert registry.Quantity(5, "%").to("").magnitude == pytest.approx(0.05)
+        assert str(registry.Quantity(1, "item").units) == "item"
+
+
+def test_lazyImports() -> None:
+    """The command line starts without loading the heavy dependencies, they are imported when needed"""
+    heavy = ("pandas", "pint", "chempy", "yaml", "graphviz", "mcsas3", "h5py")
+    code = "import sys, dachs.main; print(' '.join(sorted(set(sys.modules).intersection(sys.argv[1:]))))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, "-c", code, *heavy], capture_output=True, text=True, env=env)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+    result = subprocess.run([sys.executable, "-m", "dachs", "--help"], capture_output=True, text=True, env=env)
+    assert result.returncode == 0 and "--logbook" in result.stdout
 
 
 def test_equipment() -> None:
@@ -54,6 +114,33 @@ def test_equipment() -> None:
     ppu = e2.PricePerUnit()
     assert ppu.u == "EUR"
     assert ppu.m == pytest.approx(.6733333)
+    # the key lists are computed once per class, but each instance can extend its own
+    assert e2._storeKeys == solvent._storeKeys and e2._storeKeys is not solvent._storeKeys
+    e2._storeKeys += ["SynthesisYield"]
+    assert "SynthesisYield" not in solvent._storeKeys
+    assert len(solvent) == 14 and list(dict(solvent.items())) == list(solvent.keys())
+
+
+def test_trustedConstruction() -> None:
+    pv = PV(ID="temp", PVName="temperature", Description="bath setpoint", CalibrationFactor=1.0,
+            CalibrationOffset="0 kelvin", Setpoint="20 kelvin")
+    trusted = PV.fromTrusted(**{key: pv[key] for key in pv._storeKeys})
+    assert trusted == pv and trusted._storeKeys == pv._storeKeys
+    table = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_L019.xlsx"))
+    assert table.asRawLogMessages() == [row.asRawLogMessage() for row in table]
+    # the columns are validated as a whole, with the same errors as the constructor
+    columns = dict(Index=[0, 1], TimeStamp=[pd.Timestamp("2023-02-22", tz="UTC")] * 2, Message=["a", "b"],
+                   Value=[1.5, "text"], Unit=["g", None])
+    messages = RawLogMessage.fromColumns(**columns)
+    assert messages[0].Quantity == ureg.Quantity(1.5, "g") and messages[1].Quantity is None
+    with pytest.raises(TypeError):
+        RawLogMessage.fromColumns(**dict(columns, Value=[1.5, [2]]))
+    with pytest.raises(TypeError):
+        RawLogMessage.fromColumns(**dict(columns, Index=["0", "1"]))
+    with pytest.raises(ValueError):  # checked for each value: min_len validator of the PV ID
+        PV.validateColumns(ID=["temp", ""])
+    with pytest.raises(TypeError):
+        PV.fromTrusted(Name="temp")
 
 
 def test_readEquipment() -> None:
@@ -100,6 +187,19 @@ def test_readEquipment() -> None:
     assert filename == Path("tests/testData/AutoMOFs_The_Logbook.xlsx")
 
 
+def test_readEquipmentPVs() -> None:
+    eqDict = readEquipment(Path("tests", "testData", "AutoMOFs_The_Logbook.xlsx"))
+    assert len(eqDict) == 54
+    assert list(eqDict["SCAL_1"].PVs) == ["kern:mass", "kern:stability"]
+    assert len(eqDict["SYRP_1"].PVs) == 13
+    assert all(pv.startswith("syringepump-02:") for pv in eqDict["SYRP_2"].PVs)
+    # PV IDs in the row of the next equipment belong to that one, not to the equipment before
+    assert eqDict["PERI_4"].PVs == {}
+    assert eqDict["BATH_1"].PVs == {}
+    # the last equipment in the sheet
+    assert "RESB_1" in eqDict and eqDict["RESB_1"].PVs == {}
+
+
 def test_experiment() -> None:
     ex = Experiment(
         ID="AutoMOF5",
@@ -144,8 +244,327 @@ def test_experimental_setup() -> None:
 def test_readRawMessageLog() -> None:
     filename = Path("tests", "testData", "log_AutoMOFs_6_L019.xlsx")
     logs = readRawMessageLog(filename)
+    assert isinstance(logs, RawLogTable)
     assert len(logs) == 25
-    assert all([isinstance(log, RawLogMessage) for log in logs])
+    assert all([isinstance(log, RawLogRow) for log in logs])
+    assert all([isinstance(log, RawLogMessage) for log in logs.asRawLogMessages()])
+
+
+def test_readRawMessageLogFromRoWaNLog() -> None:
+    filename = Path("tests", "testData", "AutoMOFs_5_log.csv")
+    logs = readRawMessageLog(filename, SampleNumber="L001")
+    assert len(logs) == 38
+    assert all([log.SampleID == "L001" and log.ExperimentID == "AutoMOFs_5" for log in logs])
+    assert list(logs.column("TimeStamp")) == sorted(logs.column("TimeStamp"))
+    assert find_in_log(logs, "Sample placed in oven").Quantity == ureg.Quantity(60, "degC")
+    logs = readRawMessageLog(filename, ExperimentID="AutoMOFs_5", SampleNumber="Solution1")
+    assert [log.Value for log in find_in_log(logs, "ReagentID", Highlander=False)] == ["2MIM_2", "MeOH_2"]
+    assert len(readRawMessageLog(filename, ExperimentID="AutoMOFs_0")) == 0
+    logs, experimentID, sampleID = readIdentifiedRawLog(filename, SampleNumber="L001")
+    assert (len(logs), experimentID, sampleID) == (38, "AutoMOFs_5", "L001")
+    _, experimentID, sampleID = readIdentifiedRawLog(filename, ExperimentID="AutoMOFs_5")
+    assert (experimentID, sampleID) == ("AutoMOFs_5", None)
+
+
+def test_RawLogFollower(tmp_path) -> None:
+    source = Path("tests", "testData", "AutoMOFs_5_log.csv")
+    content = source.read_bytes()
+    filename = tmp_path / "running.log"
+    follower = RawLogFollower(filename, SampleNumber="L001")
+    assert follower.update() == []  # not written yet
+    received = []
+    follower.subscribe(received.extend)
+    firstRow = None
+    for start in range(0, len(content), 5000):  # appended in pieces, cutting through lines
+        with open(filename, "ab") as fh:
+            fh.write(content[start : start + 5000])
+        follower.update()
+        if firstRow is None and len(follower.table):
+            firstRow = follower.table[0]
+    assert follower.offset == len(content)
+    reference = readRawMessageLog(source, SampleNumber="L001")
+    assert len(follower.table) == len(received) == len(reference) == 38
+    assert received[-1] == follower.table[-1] and firstRow == follower.table[0]
+    assert list(follower.table.column("Index")) == list(range(38))
+    # same messages, lines with identical time stamps are kept in the order of the file
+    assert sorted(zip(follower.table.column("TimeStamp"), follower.table.column("Message"))) == sorted(
+        zip(reference.column("TimeStamp"), reference.column("Message"))
+    )
+    assert find_in_log(follower.table, "Sample placed in oven").Quantity == ureg.Quantity(60, "degC")
+    with open(filename, "ab") as fh:
+        fh.write(content.splitlines(keepends=True)[-1])
+    assert [row.Index for row in follower.follow(interval=0.01, timeout=0.05)] == list(range(38))
+
+
+def test_splitLog(tmp_path) -> None:
+    filename = Path("tests", "testData", "AutoMOFs_5_log.csv")
+    written = splitLog(filename, outDir=tmp_path, formats=("csv", "xlsx"), workers=2)
+    assert len(written) == 2 * 59  # 57 samples and 2 solutions in this log
+    reference = dumpKV(readRawMessageLog(filename, SampleNumber="M006"), "RawLog")
+    for suffix in (".csv", ".xlsx"):
+        assert dumpKV(readRawMessageLog(tmp_path / f"log_AutoMOFs_5_M006{suffix}"), "RawLog") == reference
+    # nothing changed, nothing to write
+    assert splitLog(filename, outDir=tmp_path, formats=("csv", "xlsx"), incremental=True) == []
+    (tmp_path / "log_AutoMOFs_5_M006.csv").unlink()
+    assert splitLog(filename, outDir=tmp_path, formats=("csv",), incremental=True) == [
+        tmp_path / "log_AutoMOFs_5_M006.csv"
+    ]
+    # numbers are stored as numbers in Excel files, the files are listed in the order of the log
+    df = readRoWaNLog(filename, parseDates=False)
+    df = df[df["SampleNumber"].isin(("L001", "M006")) & pd.to_numeric(df["Value"], errors="coerce").notna()]
+    (tmp_path / "numbers").mkdir()
+    df.to_csv(tmp_path / "numbers" / "numbers.log", sep=";", header=False, index=False)
+    written = splitLog(tmp_path / "numbers" / "numbers.log", formats=("xlsx", "csv"))
+    names = [f"log_AutoMOFs_5_{sample}{suffix}" for sample in ("M006", "L001") for suffix in (".xlsx", ".csv")]
+    assert [fn.name for fn in written] == names
+    df = pd.read_excel(written[0])
+    assert df["Value"].dtype.kind == "f" and df["Time"].dtype.kind == "O"
+
+
+def test_RawLogTable() -> None:
+    filename = Path("tests", "testData", "log_AutoMOFs_6_L019.xlsx")
+    table = readRawMessageLog(filename)
+    messages = table.asRawLogMessages()
+    assert [row.Index for row in table] == [msg.Index for msg in messages]
+    assert table[-1].Message == messages[-1].Message
+    assert table[0].Quantity == messages[0].Quantity
+    assert table[0].TimeStamp == messages[0].TimeStamp
+    # searching the table gives the same results as searching the list of messages
+    for query in (dict(searchString="Sample placed in oven"), dict(searchString="Solution", Which="last")):
+        assert find_in_log(table, **query).Index == find_in_log(messages, **query).Index
+    hits = find_in_log(table, ["Solution", "set"], excludeString="Pre-injection", Highlander=False)
+    assert [row.Message for row in hits] == ["Solution volume set", "Solution rate set"]
+    assert find_in_log(table, "nonexistent message", raiseWarning=False) is None
+    # the table serializes just like the list of messages, including the stored types
+    assert dumpKV(table, "RawLog") == dumpKV(messages, "RawLog")
+
+
+def test_iterKV() -> None:
+    table = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_L019.xlsx"))
+    structure = dict(Log=table, Messages=table[:3], Empty=[])
+    pairs = iterKV(structure, "Root")
+    first = next(pairs)
+    assert first == (PurePosixPath("Root", "type"), "builtins.dict")
+    assert [first] + list(pairs) == list(dumpKV(structure, "Root").items())
+    # the type of each node comes before its children
+    keys = [key for key, _ in iterKV(structure, "Root")]
+    row = PurePosixPath("Root", "Log", "0")
+    assert keys.index(row / "type") < keys.index(row / "Message")
+    assert keys[-1] == PurePosixPath("Root", "Empty")
+    graph = KVGraph()
+    assert len(list(graph.collect(iterKV(structure, "Root")))) == len(keys)
+    assert graph.name == "Root" and graph.nodes[row.parent] == "builtins.list"
+    assert graph.nodes[PurePosixPath("Root", "Empty")] == "builtins.list"
+    # the messages share a node, the graph does not grow with the log
+    item = row.parent / KVGraph.itemName
+    assert graph.nodes[item] == "dachs.synthesis.RawLogMessage" and (row.parent, item) in graph.edges
+    assert row not in graph.nodes and item / "Message" in graph.nodes
+    shortGraph = KVGraph()
+    for path, value in iterKV(dict(Log=table[:2], Messages=table[:3], Empty=[]), "Root"):
+        shortGraph.add(path, value)
+    assert shortGraph.nodes == graph.nodes and shortGraph.edges == graph.edges
+
+
+def test_LogIndex() -> None:
+    table = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_L019.xlsx"))
+    messages = [message.lower() for message in table.column("Message")]
+    index = LogIndex(table.column("Message"))
+    queries = [
+        (["start injection of solution"], []),
+        (["Sample", "oven"], []),
+        (["falcon tube"], ["reversed"]),
+        (["jection of sol"], []),  # parts of words
+        (["environment:temp"], []),
+        (["INJECTION"], []),
+        ([" of "], []),
+        (["."], []),
+        (["no such message"], []),
+        ([], ["stirr"]),
+    ]
+    for search, exclude in queries:
+        expected = [
+            pos
+            for pos, message in enumerate(messages)
+            if all(i.lower() in message for i in search) and not any(j in message for j in exclude)
+        ]
+        assert list(index.matches(search, exclude)) == expected, f"{search=}, {exclude=}"
+        assert index.first(search, exclude) == (expected[0] if len(expected) else None)
+        assert index.last(search, exclude) == (expected[-1] if len(expected) else None)
+    assert table.logIndex() is table.logIndex()
+    assert find_in_log(table, "injection of solution", Which="last") == table[index.last("injection of solution")]
+    assert len(find_in_log(table, "arduino", Highlander=False)) == 6
+
+
+def test_find_many_in_log() -> None:
+    table = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_L019.xlsx"))
+    queries = dict(
+        start=LogQuery("Start injection of solution", Which="last"),
+        oven=LogQuery(["Sample", "oven"], Which="first"),
+        volumes=LogQuery(["Solution", "volume set"], Which="all"),
+        tube=LogQuery(["Falcon tube"], excludeString=["reversed", "dry sample"], Which="all"),
+        missing=LogQuery("no such message", raiseWarning=False),
+    )
+    for log in (table, table.asRawLogMessages()):
+        found = find_many_in_log(log, queries)
+        assert found.keys() == queries.keys() and found["missing"] is None
+        for name, query in queries.items():
+            expected = find_in_log(
+                log,
+                query.searchString,
+                excludeString=query.excludeString,
+                Highlander=query.Which != "all",
+                Which=query.Which,
+                raiseWarning=False,
+            )
+            assert found[name] == expected, name
+    assert found["oven"].Message == "Sample placed in oven"
+    assert len(found["volumes"]) == 2
+    # terms match within and across words, as substrings of the lowercased messages
+    messages = table.column("Message")
+    partial = dict(inside=["ction of sol"], across=["AMPLE PLA", "n ov"])
+    index = LogIndex(messages)
+    looked = []
+    candidates = index._candidates
+    index._candidates = lambda term: looked.append(term) or candidates(term)
+    found = index.matchMany({name: LogQuery(terms) for name, terms in partial.items()})
+    for name, terms in partial.items():
+        expected = [i for i, msg in enumerate(messages) if all(t.lower() in msg.lower() for t in terms)]
+        assert list(found[name]) == expected and len(expected)
+    assert sorted(looked) == sorted(t.lower() for terms in partial.values() for t in terms)  # via the index
+
+
+def test_RawLogTableLookup() -> None:
+    table = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_Solution1.xlsx"))
+    for row in table:
+        assert table.byIndex(row.Index) == row
+        previous = [i for i in table if i.Index == row.Index - 1]
+        assert table.byIndex(row.Index - 1) == (previous[-1] if len(previous) else None)
+    assert table.byIndex(len(table)) is None
+    assert table[0].previous() is None and table[-1].next() is None
+    assert table[3].next().previous() == table[3]
+    # closest ReagentID message before each mass
+    masses = find_in_log(table, "mass of", Highlander=False)
+    for mass in masses:
+        expected = [i for i in table[: table.position(mass.Index)] if "reagentid" in i.Message.lower()]
+        assert mass.previousMatch("ReagentID") == (expected[-1] if len(expected) else None)
+    assert table[0].previousMatch("ReagentID") is None
+
+
+def test_RawLogTableReadouts() -> None:
+    table = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_Solution1.xlsx"))
+    readouts = table.readouts()
+    # the same values as the scalar Quantities of each row
+    scalar = [row for row in table if row.Quantity is not None]
+    assert sum(len(r.Index) for r in readouts.values()) == len(scalar)
+    for row in scalar:
+        group = readouts[str(row.Quantity.units)]
+        n = list(group.Index).index(row.Index)
+        assert group.Quantity[n] == row.Quantity
+        assert group.TimeStamp[n] == row.TimeStamp
+    masses = table.readouts("mass of")
+    assert list(masses) == ["gram"]
+    assert list(masses["gram"].Index) == [m.Index for m in find_in_log(table, "mass of", Highlander=False)]
+    # unit strings resolving to the same unit form one group, unknown units are left out
+    table = RawLogTable(
+        Message=["a", "b", "c", "d", "e"],
+        Value=["1", "2", "3", "text", "5"],
+        Unit=["mins", "minute", "g", "g", "zorks"],
+    )
+    readouts = table.readouts()
+    assert list(readouts) == ["minute", "gram"]
+    assert list(readouts["minute"].Quantity.magnitude) == [1.0, 2.0]
+    assert list(readouts["minute"].Index) == [0, 1]
+
+
+def test_RawLogTableCategorical(tmp_path) -> None:
+    table = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_L019.xlsx"))
+    codes, categories = table.categorical("SampleID")
+    assert len(categories) == 1 and codes.dtype == "int32" and len(codes) == len(table)
+    assert table[0].SampleID is table[-1].SampleID
+    messages = list(table.column("Message"))
+    other = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_Solution0.xlsx"))
+    table.extend(other)
+    assert list(table.column("Message")) == messages + list(other.column("Message"))
+    assert table.categorical("SampleID")[1] == categories + other.categorical("SampleID")[1]
+    assert [row.Unit for row in table] == list(table.column("Unit"))
+    # the columnar HDF5 layout stores the codes and categories of each text column
+    assert rawLogLayout("Columns") == "columns"
+    with pytest.raises(ValueError):
+        rawLogLayout("cells")
+    paths = dumpKV(table, "RawLog", logLayout="columns")
+    path = PurePosixPath("RawLog")
+    assert paths[path / "type"] == "dachs.synthesis.RawLogTable" and paths[path / "layout"] == "columns"
+    codes, categories = paths[path / "Message" / "codes"], paths[path / "Message" / "categories"]
+    assert list(categories[codes]) == list(table.column("Message"))
+    units = paths[path / "Unit" / "categories"]
+    assert [units[c] if c >= 0 else None for c in paths[path / "Unit" / "codes"]] == list(table.column("Unit"))
+    numbers = paths[path / "Value" / "number"]
+    assert all(number == row.Value for number, row in zip(numbers, table) if isinstance(row.Value, (int, float)))
+    storeKVPairs(tmp_path / "log.h5", "", paths.items())
+    with h5py.File(tmp_path / "log.h5", "r") as h5f:
+        assert list(h5f["RawLog/SampleID/categories"].asstr()) == table.categorical("SampleID")[1]
+        assert len(h5f["RawLog/Index"]) == len(table)
+
+
+def test_writeKV(tmp_path) -> None:
+    table = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_L019.xlsx"))
+    extra = dict(Table=pd.DataFrame(dict(a=[1, 2])), Nothing=None)
+    pairs = list(iterKV(dict(Log=table[:50]), "Root")) + list(iterKV(table, "Root/Columns", logLayout="columns"))
+    pairs += [(PurePosixPath("Root", "Extra"), extra)]
+    storeKVPairs(tmp_path / "reference.h5", "", pairs)
+    assert writeKV(tmp_path / "written.h5", iter(pairs)) == len(pairs)
+
+    def contents(filename):
+        items = {}
+
+        def store(name, obj):
+            items[name] = (repr(obj[()]) if isinstance(obj, h5py.Dataset) else None, dict(obj.attrs))
+
+        with h5py.File(filename, "r") as h5f:
+            h5f.visititems(store)
+        return items
+
+    assert contents(tmp_path / "written.h5") == contents(tmp_path / "reference.h5")
+    # compressed arrays, existing datasets are replaced
+    assert writeKV(tmp_path / "written.h5", pairs, compression="gzip", shuffle=True, minSize=0) == len(pairs)
+    assert contents(tmp_path / "written.h5") == contents(tmp_path / "reference.h5")
+    with h5py.File(tmp_path / "written.h5", "r") as h5f:
+        assert h5f["Root/Columns/Message/codes"].compression == "gzip"
+        assert h5f["Root/Log/0/Value"].compression is None and h5f["Root/Log/0/Quantity"].attrs["unit"] == "gram"
+    with pytest.raises(ValueError):
+        writeKV(tmp_path / "written.h5", pairs, compression="zip")
+
+
+def test_find_reagent_masses() -> None:
+    table = readRawMessageLog(Path("tests", "testData", "log_AutoMOFs_6_Solution0.xlsx"))
+    masses = find_reagent_masses(table)
+    assert list(masses) == ["Zn6H_2", "MeOH_2"]
+    assert [RLM.Quantity for RLM in masses["Zn6H_2"]] == [ureg.Quantity(17.7356, "g")]
+    # IDs are matched exactly, not by their occurrence in the message
+    table = RawLogTable(
+        Message=["ReagentID", "mass of MeOH_20", "ReagentID", "mass of MeOH_2", "Note", "ReagentID"],
+        Value=["MeOH_20", "1.5", "MeOH_2", "2.5", "mass of nothing", "MeOH_2"],
+        Unit=[None, "g", None, "g", None, None],
+        TimeStamp=pd.date_range("2023-02-22", periods=6, freq="s", tz="UTC"),
+    )
+    for log in (table, table.asRawLogMessages()):
+        masses = find_reagent_masses(log)
+        assert {ID: [RLM.Value for RLM in RLMs] for ID, RLMs in masses.items()} == {
+            "MeOH_20": [1.5],
+            "MeOH_2": [2.5],
+        }
+
+
+def test_RawLogTableConversion() -> None:
+    values = ["12", "12", "-3.50", " - ", "yes", "1e5", "text", 7, 2.5, float("nan"), None, "012", "7"]
+    units = ["%", "C", "mins", " g ", "-", None, float("nan"), "ml/min", "%", "g", None, "", 1.0]
+    table = RawLogTable(Message=["m"] * len(values), Value=values, Unit=units)
+    for val, unit, row in zip(values, units, table):
+        expected = ValConverter(val) if val is not None else None
+        assert type(row.Value) is type(expected) and (row.Value == expected or pd.isnull(expected)), val
+        assert row.Unit == (UnitConverter(unit) if unit is not None else None), unit
+    assert table[0].Quantity == ureg.Quantity(12, "percent")
+    assert table[2].Quantity == ureg.Quantity(-3.5, "minute")
 
 
 def test_ReadStartingCompounds() -> None:
@@ -155,6 +574,117 @@ def test_ReadStartingCompounds() -> None:
     assert all([isinstance(c, Reagent) for c in comp])
 
 
+def test_createMultipleExperiments(tmp_path) -> None:
+    """A RoWaN log holding several experiments requires selecting one of them"""
+    basepath = Path("tests", "testData")
+    content = (basepath / "AutoMOFs_5_log.csv").read_text()
+    logFile = tmp_path / "AutoMOFs_log.csv"
+    logFile.write_text(content + content.replace(";AutoMOFs_5;", ";AutoMOFs_7;"))
+    arguments = (basepath / "AutoMOFs_The_Logbook.xlsx", [logFile, logFile], logFile, "AMSET_6")
+    with pytest.raises(AssertionError):
+        create(*arguments, sampleID="L001")
+    exp = create(*arguments, sampleID="L001", experimentID="AutoMOFs_5")
+    assert exp.Chemicals.Mixtures[0].ComponentMasses["Zn6H_2"] == ureg.Quantity(29.5631, "g")
+    assert set(exp.Synthesis.RawLog.column("ExperimentID")) == {"AutoMOFs_5"}
+
+
+def test_mainWithoutGraph(tmp_path, monkeypatch) -> None:
+    """The structure is written without collecting and rendering its graph"""
+    basepath = Path("tests", "testData").absolute()
+    logFile = tmp_path / "AutoMOFs_5_log.csv"
+    logFile.write_bytes((basepath / "AutoMOFs_5_log.csv").read_bytes())
+    for name in ("DACHS_SOL0", "DACHS_SOL1", "DACHS_SOL2"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.chdir(tmp_path)
+    main(["-l", str(basepath / "AutoMOFs_The_Logbook.xlsx"), "-s", str(logFile), "-n", "L001", "-a", "AMSET_6",
+          "-g", "none"])
+    assert (tmp_path / "AutoMOFs_5_log_L001.h5").is_file()
+    assert not list(tmp_path.glob("*.svg"))
+
+
+def test_LogbookCache(tmp_path) -> None:
+    filename = tmp_path / "AutoMOFs_The_Logbook.xlsx"
+    filename.write_bytes(Path("tests", "testData", "AutoMOFs_The_Logbook.xlsx").read_bytes())
+    cache = LogbookCache(sidecarDir=tmp_path / "cache")
+    sheet = cache.sheet(filename, "Chemicals", engine="openpyxl")
+    assert len(sheet) == 22
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 1
+    assert (tmp_path / "cache").stat().st_mode & 0o077 == 0  # private to the user
+    # a new cache instance (another process) reuses the sidecar file, with the same values and types
+    stored = LogbookCache(sidecarDir=tmp_path / "cache").sheet(filename, "Chemicals", engine="openpyxl")
+    pd.testing.assert_frame_equal(stored, sheet, check_exact=True)
+    assert [type(val) for val in stored["Open Date"]] == [type(val) for val in sheet["Open Date"]]
+    # each engine has its own entries
+    if engineAvailable("calamine"):
+        cache.sheet(filename, "Chemicals", engine="calamine")
+        assert len(list((tmp_path / "cache").glob("*.json"))) == 2
+    calls = []
+    objs = cache.objects(filename, "test", lambda: calls.append(1) or [{"Used": False}])
+    objs[0]["Used"] = True  # modifying the copy does not affect the cache
+    assert cache.objects(filename, "test", lambda: calls.append(1) or [{"Used": False}]) == [{"Used": False}]
+    assert len(calls) == 1
+    # the cached entries get invalidated when the file changes
+    stat = filename.stat()
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache.objects(filename, "test", lambda: calls.append(1) or [])
+    assert len(calls) == 2
+
+
+def test_excelEngine(monkeypatch) -> None:
+    monkeypatch.delenv("DACHS_EXCEL_ENGINE", raising=False)
+    assert excelEngine() == ("calamine" if engineAvailable("calamine") else "openpyxl")
+    monkeypatch.setenv("DACHS_EXCEL_ENGINE", "openpyxl")
+    assert excelEngine() == "openpyxl"
+    assert excelEngine("auto") != "auto"
+    with pytest.raises(ValueError):
+        excelEngine("xlrd")
+    # all engines give the same result
+    filename = Path("tests", "testData", "log_AutoMOFs_6_Solution0.xlsx")
+    reference = readWorkbook(filename, "Sheet1", engine="openpyxl", parse_dates=["Time"])
+    pd.testing.assert_frame_equal(readWorkbook(filename, "Sheet1", engine="auto", parse_dates=["Time"]), reference)
+
+
+def test_FormulaCache(tmp_path) -> None:
+    storeFile = tmp_path / "formulas.json"
+    cache = FormulaCache(storeFile=storeFile)
+    mm = cache.molarMass("C8H10N4Zn")
+    assert mm.units == ureg.Unit("g/mol")
+    assert mm.magnitude == pytest.approx(227.576)
+    assert cache.substance("C8H10N4Zn") is cache.substance("C8H10N4Zn")
+    assert storeFile.is_file()
+    # a new process reads the parsed formula from the store
+    restored = FormulaCache(storeFile=storeFile)
+    assert restored.molarMass("C8H10N4Zn") == mm
+    assert restored.substance("C8H10N4Zn").composition == {6: 8, 1: 10, 7: 4, 30: 1}
+    chem = Chemical.fromFormula("C4H6N2", ChemicalID="2MIM", ChemicalName="2-methylimidazole")
+    assert chem.MolarMass.to("g/mol").magnitude == pytest.approx(82.106, abs=1e-3)
+    assert "C4H6N2" in chem.Substance.name
+
+
+def test_UnitCache() -> None:
+    cache = UnitCache()
+    assert cache.unit("%") == ureg.percent
+    assert cache.unit(" C ") == ureg.degC
+    assert cache.unit("mins") is cache.unit("mins")
+    q = cache.quantity(2.0, "mins")
+    assert q == ureg.Quantity(2.0, "minute")
+    # unknown units raise a new error like the remembered one on each use
+    with pytest.raises(Exception) as first:
+        cache.unit("furlongs per fortnightly")
+    with pytest.raises(Exception) as second:
+        cache.unit("furlongs per fortnightly")
+    assert type(first.value) is type(second.value) and str(first.value) == str(second.value)
+    assert first.value is not second.value
+    assert len(list(traceback.walk_tb(first.tb))) == len(list(traceback.walk_tb(second.tb)))
+    assert not cache.isUnit("furlongs per fortnightly")
+    assert ConvertToQuantity(1.5, "furlongs per fortnightly") is None
+    assert ConvertToQuantity(1.5, "%") == ureg.Quantity(1.5, "percent")
+    # parsed quantities are new objects each time
+    density = cache.parse("0.792 g/cc")
+    assert density == ureg.Quantity("0.792 g/cc")
+    assert cache.parse("0.792 g/cc") is not density
+
+
 def test_product() -> None:
     # define a zif Chemical:
     zifChemical = Chemical(
@@ -258,3 +788,100 @@ def test_reagent() -> None:
     assert mixture.total_price.m == pytest.approx(58.87585584)
     assert mixture.total_price.u == "EUR"
     logging.info(f"\n {mixture.component_concentrations()=}, {mixture.total_mass=}, {mixture.total_price=}")
+
+
+def test_mixtureComposition() -> None:
+    def reagent(ID, formula, molarMass, density, price):
+        return Reagent(
+            ID=ID,
+            Chemical=Chemical(
+                ID=ID,
+                ChemicalName=ID,
+                ChemicalFormula=formula,
+                MolarMass=ureg.Quantity(molarMass),
+                Density=ureg.Quantity(density),
+            ),
+            CASNumber="-",
+            Brand="-",
+            UNNumber="-",
+            MinimumPurity="99 percent",
+            OpenDate="2022-05-01T10:04:22",
+            UnitPrice=price,
+            UnitSize="1000 gram",
+        )
+
+    meoh = reagent("MeOH", "CH3OH", "32.04 g/mol", "0.79 g/ml", "20 euro")
+    zinc = reagent("Zn", "Zn(NO3)2*6H2O", "297.49 g/mol", "2.07 g/ml", "150 euro")
+    mix = Mixture(ID="mix", MixtureName="mix", Description="", PreparationDate=pd.Timestamp("2023-01-01"))
+    mix.add_reagent_to_mix(meoh, ureg.Quantity("10 g"))
+    mix.add_reagent_to_mix(zinc, ureg.Quantity("500 mg"))
+    assert mix.total_mass == ureg.Quantity("10.5 g")
+    assert mix.total_moles().m == pytest.approx(10 / 32.04 + 0.5 / 297.49)
+    assert mix.total_price.m == pytest.approx(10 * 0.02 + 0.5 * 0.15)
+    moles = mix._composition()["vectors"]["mole"][1]
+    cachedMeOH = moles[0]
+    # adding more of a component updates only its entry
+    mix.add_reagent_to_mix(zinc, ureg.Quantity("0.5 g"))
+    assert moles[0] is cachedMeOH and moles[1] == pytest.approx(1 / 297.49)
+    assert mix.total_mass == ureg.Quantity("11 g")
+    assert mix.component_moles(zinc).m == pytest.approx(1 / 297.49)
+    # replacing a mass directly is noticed as well
+    mix.ComponentMasses["MeOH"] = ureg.Quantity("20 g")
+    assert mix.total_mass == ureg.Quantity("21 g")
+    conc = mix.component_concentrations()
+    assert sum(q.m for q in conc) == pytest.approx(1)
+    assert conc[1] == mix.component_concentration(zinc)
+    # half of it added to another mixture
+    other = Mixture(ID="other", MixtureName="other", Description="", PreparationDate=pd.Timestamp("2023-01-01"))
+    other.add_mixture_to_mix(mix, AddMixtureMass=ureg.Quantity("10.5 g"))
+    assert other.total_mass.m == pytest.approx(10.5)
+    assert other.total_price.m == pytest.approx(mix.total_price.m / 2)
+    other.add_mixture_to_mix(mix, AddMixtureMass=ureg.Quantity("10.5 g"))
+    assert other.total_moles().m == pytest.approx(mix.total_moles().m)
+    assert [q.m for q in other.component_concentrations()] == pytest.approx([q.m for q in conc])
+    # components added directly are noticed
+    other.ComponentList = [meoh]
+    assert [q.m for q in other.component_concentrations()] == [1]
+    # so are changes of the price or chemical of a component after it was added
+    single = Mixture(ID="single", MixtureName="single", Description="", PreparationDate=pd.Timestamp("2023-01-01"))
+    solvent = reagent("Solvent", "CH3OH", "32.04 g/mol", "0.79 g/ml", "20 euro")
+    single.add_reagent_to_mix(solvent, ureg.Quantity("10 g"))
+    assert single.total_price.m == pytest.approx(0.2) and single.total_moles().m == pytest.approx(10 / 32.04)
+    solvent.UnitPrice = "40 euro"
+    solvent.Chemical.MolarMass = ureg.Quantity("64.08 g/mol")
+    assert single.total_price.m == pytest.approx(0.4) and single.total_moles().m == pytest.approx(10 / 64.08)
+
+
+def test_derivedPrices() -> None:
+    solvent = Reagent(
+        ID="Solvent_1",
+        Chemical=Chemical(
+            ID="MeOH",
+            ChemicalName="Methanol",
+            ChemicalFormula="CH3OH",
+            MolarMass=ureg.Quantity("32.04 g/mol"),
+            Density=ureg.Quantity("0.79 g/ml"),
+        ),
+        CASNumber="67-56-1",
+        Brand="Chemsolute",
+        UNNumber="1230",
+        MinimumPurity="98 percent",
+        OpenDate="2022-05-01T10:04:22",
+        UnitPrice="10.9 USD",
+        UnitSize="2.5 liter",
+    )
+    pricePerMass = solvent.price_per_mass()
+    assert pricePerMass.to("euro/g").m == pytest.approx(10 / 2500 / 0.79)
+    assert pricePerMass == (ureg.Quantity("10.9 USD") / ureg.Quantity("2.5 liter") / ureg.Quantity("0.79 g/ml"))
+    assert solvent.price_per_mass() is pricePerMass
+    assert solvent.PricePerMole().m == pytest.approx(10 / 2500 / 0.79 * 32.04)
+    # replacing any of the inputs recomputes the prices
+    solvent.UnitPrice = "20 EUR"
+    assert solvent.price_per_mass().m == pytest.approx(20 / 2500 / 0.79)
+    solvent.Chemical.Density = ureg.Quantity("1 g/ml")
+    assert solvent.price_per_mass().m == pytest.approx(20 / 2500)
+    assert solvent.PricePerMole().m == pytest.approx(20 / 2500 * 32.04)
+    bath = Equipment(ID="BATH_1", UnitPrice=ureg.Quantity("9756 euro"), UnitSize=ureg.Quantity("1 item"))
+    assert bath.PricePerUnit() is bath.PricePerUnit()
+    bath.UnitSize = ureg.Quantity("2 item")
+    assert bath.PricePerUnit() == ureg.Quantity("4878 euro/item")
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 # test_structure.py
 
-from os import environ
 from pathlib import Path
 
+import h5py
+
 from dachs.main import main
 
 # import sys
@@ -13,21 +14,47 @@ from dachs.main import main
 basepath = Path(__file__).parent / "testData"
 
 
-def test_integral() -> None:
-    environ["DACHS_LOGBOOK"] = str(basepath / "AutoMOFs_The_Logbook.xlsx")
-    environ["DACHS_AMSET"] = "AMSET_6"
+def test_integral(monkeypatch) -> None:
+    monkeypatch.setenv("DACHS_LOGBOOK", str(basepath / "AutoMOFs_The_Logbook.xlsx"))
+    monkeypatch.setenv("DACHS_AMSET", "AMSET_6")
     for s0, s1, syn in (
         ("log_AutoMOFs_6_Solution0.xlsx", "log_AutoMOFs_6_Solution1.xlsx", "log_AutoMOFs_6_L019.xlsx"),
     ):
         try:
-            environ["DACHS_SOL0"] = str(basepath / s0)
-            environ["DACHS_SOL1"] = str(basepath / s1)
-            environ["DACHS_SYNLOG"] = str(basepath / syn)
+            monkeypatch.setenv("DACHS_SOL0", str(basepath / s0))
+            monkeypatch.setenv("DACHS_SOL1", str(basepath / s1))
+            monkeypatch.setenv("DACHS_SYNLOG", str(basepath / syn))
             main(args=[])  # replace sys.argv with empty list, to not interfer with pytest args
         except Exception:
             print(f"Failed files {s0=}, {s1=}, {syn=}")
             raise
 
 
+def test_integral_rawlog(monkeypatch) -> None:
+    """Reads the synthesis and its solutions directly from the original RoWaN log, no Excel split."""
+    for name in ("DACHS_SOL0", "DACHS_SOL1", "DACHS_SOL2"):  # the solutions are read from the RoWaN log
+        monkeypatch.delenv(name, raising=False)
+    main(
+        args=[
+            "-l",
+            str(basepath / "AutoMOFs_The_Logbook.xlsx"),
+            "-s",
+            str(basepath / "AutoMOFs_5_log.csv"),
+            "-n",
+            "L001",
+            "-a",
+            "AMSET_6",
+        ]
+    )
+    assert (basepath / "AutoMOFs_5_log_L001.h5").is_file()
+    with h5py.File(basepath / "AutoMOFs_5_log_L001.h5", "r") as h5f:
+        for solution in ("Solution0", "Solution1"):
+            rawLog = h5f[f"DACHS/Chemicals/Mixtures/{solution}/{solution}_Synthesis/RawLog"]
+            rows = [rawLog[key] for key in rawLog if key != "type"]
+            assert len(rows) and {row["ExperimentID"].asstr()[()] for row in rows} == {"AutoMOFs_5"}
+            assert {row["SampleID"].asstr()[()] for row in rows} == {solution}
+        assert h5f["DACHS/Chemicals/Mixtures/Solution0/ComponentMasses/Zn6H_2"][()] == 29.5631
+
+
 if __name__ == "__main__":
     test_integral()